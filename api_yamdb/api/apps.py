@@ -5,3 +5,7 @@ class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
     verbose_name = 'API библиотеки отзывов'
+
+    def ready(self):
+        import api.authentication  # noqa: F401
+        import api.tokens  # noqa: F401
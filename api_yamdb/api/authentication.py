@@ -0,0 +1,155 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken)
+from rest_framework_simplejwt.settings import api_settings
+
+from api.tokens import revoked_tokens
+from api_yamdb.constants import (AUTH_TOKEN_CACHE_SIZE,
+                                 AUTH_TOKEN_CACHE_TIMEOUT,
+                                 AUTH_USER_CACHE_TIMEOUT,
+                                 AUTH_USER_LOCAL_CACHE_SIZE,
+                                 AUTH_USER_LOCAL_CACHE_TIMEOUT)
+
+User = get_user_model()
+USER_CACHE_KEY = 'auth_user:{}'
+
+
+class LocalCache:
+    """LRU в памяти процесса с ограниченным временем жизни и счётчиками."""
+
+    def __init__(self, maxsize, timeout):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            item = self.items.get(key)
+            if item is not None and item[1] < time.monotonic():
+                del self.items[key]
+                item = None
+            if item is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.items.move_to_end(key)
+            return item[0]
+
+    def set(self, key, value, timeout=None):
+        if timeout is None:
+            timeout = self.timeout
+        with self.lock:
+            self.items[key] = (value, time.monotonic() + timeout)
+            self.items.move_to_end(key)
+            while len(self.items) > self.maxsize:
+                self.items.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.items.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self.items),
+            'maxsize': self.maxsize,
+        }
+
+
+local_users = LocalCache(
+    AUTH_USER_LOCAL_CACHE_SIZE, AUTH_USER_LOCAL_CACHE_TIMEOUT)
+# Проверенные токены по хешу: подпись повторно не проверяется.
+verified_tokens = LocalCache(AUTH_TOKEN_CACHE_SIZE, AUTH_TOKEN_CACHE_TIMEOUT)
+
+
+def get_shared_cache():
+    """Общий кеш пользователей или None, если он отключён."""
+    alias = getattr(settings, 'AUTH_USER_CACHE', None)
+    return caches[alias] if alias else None
+
+
+def invalidate_user(user_id):
+    local_users.delete(user_id)
+    shared = get_shared_cache()
+    if shared is not None:
+        shared.delete(USER_CACHE_KEY.format(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация с кешем пользователей.
+
+    Пользователь ищется в LRU процесса, затем в общем кеше и только потом
+    в базе. Каждый запрос получает свою копию объекта. Проверенные токены
+    кешируются по хешу до истечения срока действия, отозванные отсекаются
+    фильтром revoked_tokens.
+    """
+
+    def get_validated_token(self, raw_token):
+        key = hashlib.sha256(raw_token).digest()
+        validated_token = verified_tokens.get(key)
+        if validated_token is None:
+            validated_token = super().get_validated_token(raw_token)
+            timeout = min(
+                validated_token['exp'] - time.time(),
+                AUTH_TOKEN_CACHE_TIMEOUT)
+            if timeout > 0:
+                verified_tokens.set(key, validated_token, timeout)
+        if revoked_tokens.is_revoked(validated_token):
+            raise InvalidToken(_('Token is invalid or expired'))
+        return validated_token
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+        user = local_users.get(user_id)
+        if user is None:
+            user = self.get_shared_user(user_id, validated_token)
+            local_users.set(user_id, user)
+        if not user.is_active:
+            raise AuthenticationFailed(
+                _('User is inactive'), code='user_inactive')
+        return copy.copy(user)
+
+    def get_shared_user(self, user_id, validated_token):
+        shared = get_shared_cache()
+        key = USER_CACHE_KEY.format(user_id)
+        user = shared.get(key) if shared is not None else None
+        if user is None:
+            user = super().get_user(validated_token)
+            if shared is not None:
+                shared.set(key, user, AUTH_USER_CACHE_TIMEOUT)
+        return user
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Сбрасывает кеш изменённого или удалённого пользователя."""
+    invalidate_user(instance.pk)
+    # Повторно после фиксации: до неё кеш мог заполниться старыми данными.
+    transaction.on_commit(lambda: invalidate_user(instance.pk))
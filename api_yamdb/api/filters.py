@@ -1,28 +1,115 @@
 import django_filters
+from rest_framework import filters
 
-from reviews.models import Title
+from api.pagination import ordering_expressions
+from reviews.models import Category, Genre, GenreTitle, Title
+from reviews.search import search_titles
+
+GENRE_MODE_ANY = 'any'
+GENRE_MODE_ALL = 'all'
+GENRE_MODES = (
+    (GENRE_MODE_ANY, 'Любой из жанров'),
+    (GENRE_MODE_ALL, 'Все жанры'),
+)
+
+
+class SlugInFilter(django_filters.BaseInFilter, django_filters.CharFilter):
+    """Список слагов через запятую."""
 
 
 class TitleManyFilters(django_filters.FilterSet):
     """
     Комбинированный фильтр для вывода произведений.
 
-    Поиск категории и жанра по слагу.
+    Точный поиск категорий и жанров по списку слагов, диапазон годов,
+    полнотекстовый поиск по названию и описанию.
     """
 
-    category = django_filters.CharFilter(
-        field_name='category__slug',
-        lookup_expr='icontains'
-    )
-    genre = django_filters.CharFilter(
-        field_name='genre__slug',
-        lookup_expr='icontains'
+    category = SlugInFilter(method='filter_category')
+    genre = SlugInFilter(method='filter_genre')
+    genre_mode = django_filters.ChoiceFilter(
+        choices=GENRE_MODES,
+        method='filter_genre_mode'
     )
     name = django_filters.CharFilter(
         field_name='name',
         lookup_expr='icontains'
     )
+    search = django_filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = ('category', 'genre', 'name', 'year')
+        fields = {
+            'year': ('exact', 'gte', 'lte'),
+        }
+
+    def filter_category(self, queryset, name, value):
+        return queryset.filter(category_id__in=Category.objects.filter(
+            slug__in=value).values('id'))
+
+    def filter_genre(self, queryset, name, value):
+        # IN по подзапросу вместо JOIN: произведение не дублируется в
+        # выдаче, а связи читаются по индексу (genre, title).
+        if self.form.cleaned_data.get('genre_mode') == GENRE_MODE_ALL:
+            for slug in set(value):
+                queryset = queryset.filter(id__in=GenreTitle.objects.filter(
+                    genre__slug=slug).values('title_id'))
+            return queryset
+        return queryset.filter(id__in=GenreTitle.objects.filter(
+            genre_id__in=Genre.objects.filter(
+                slug__in=value).values('id')).values('title_id'))
+
+    def filter_genre_mode(self, queryset, name, value):
+        # Режим учитывается в filter_genre.
+        return queryset
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
+
+
+class TitleOrderingFilter(filters.OrderingFilter):
+    """
+    Сортировка произведений, при поиске - по релевантности.
+
+    Сортировка дополняется уникальным ключом: рейтинг и число отзывов - до
+    полей индексов title_rating_idx и title_reviews_count_idx, остальные
+    поля - до `id`. Положение NULL задаётся явно, как в курсорной
+    пагинации.
+    """
+
+    # Имена параметра сортировки и соответствующие им поля.
+    ordering_aliases = {
+        'rating': ('rating', 'score_count', '-id'),
+        'reviews_count': ('score_count', 'rating', '-id'),
+        'category': ('category__name', 'id'),
+    }
+
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request, queryset, view)
+        if not ordering:
+            return queryset
+        return queryset.order_by(
+            *ordering_expressions(queryset.model, ordering))
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not ordering:
+            return ordering
+        result = []
+        for term in ordering:
+            descending = term.startswith('-')
+            for name in self.ordering_aliases.get(
+                    term.lstrip('-'), (term.lstrip('-'),)):
+                if descending:
+                    name = name[1:] if name.startswith('-') else f'-{name}'
+                if name.lstrip('-') not in (
+                        item.lstrip('-') for item in result):
+                    result.append(name)
+        if 'id' not in (item.lstrip('-') for item in result):
+            result.append('id')
+        return result
+
+    def get_default_ordering(self, view):
+        if view.request.query_params.get('search'):
+            return ('-search_rank', 'id')
+        return super().get_default_ordering(view)
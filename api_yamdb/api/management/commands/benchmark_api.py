@@ -0,0 +1,409 @@
+import json
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime
+from itertools import count
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import override_settings
+from rest_framework.settings import api_settings
+
+from api.tokens import RoleAccessToken
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import ADMIN, ProjectUser
+
+BENCH_ADMIN = 'bench_admin'
+# Отзывов в одном запросе пакетной загрузки.
+BENCH_BULK_SIZE = 10
+
+
+class QueryCounter:
+    """Считает запросы к базе без сохранения их текста."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def percentile(values, share):
+    """Значение перцентиля share (0..1) по отсортированному списку."""
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ('git', 'rev-parse', '--short', 'HEAD'),
+            capture_output=True, text=True, check=True,
+            cwd=settings.BASE_DIR,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    """Скрипт для замеров производительности эндпоинтов API."""
+
+    help = ('Выполняет запросы ко всем эндпоинтам API на текущих данных и '
+            'сохраняет p50/p95 времени ответа, число запросов к базе и '
+            'пиковую память в JSON. Замеры идут в транзакции, которая '
+            'откатывается, без ограничения частоты запросов; кеш после '
+            'замеров очищается.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50,
+                            help='Запросов к каждому эндпоинту.')
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--cold', action='store_true',
+                            help='Очищать кеш перед каждым запросом.')
+        parser.add_argument('--only', default='',
+                            help='Имена эндпоинтов через запятую.')
+        parser.add_argument('--output', default='',
+                            help='Файл для результатов в формате JSON.')
+        parser.add_argument('--compare', default='',
+                            help='Файл с предыдущими результатами.')
+
+    def handle(self, *args, **options):
+        dataset = {
+            model._meta.model_name: model.objects.count()
+            for model in (ProjectUser, Category, Genre, Title,
+                          Review, Comment)
+        }
+        rates = {
+            scope: None
+            for scope in api_settings.DEFAULT_THROTTLE_RATES
+        }
+        rest_framework = {
+            **getattr(settings, 'REST_FRAMEWORK', {}),
+            'DEFAULT_THROTTLE_RATES': rates,
+        }
+        with override_settings(REST_FRAMEWORK=rest_framework):
+            with transaction.atomic():
+                results = self.run_routes(options)
+                # Данные, созданные замерами, не сохраняются.
+                transaction.set_rollback(True)
+        # В кеше могли остаться ответы с откаченными данными.
+        cache.clear()
+
+        commit = git_commit()
+        output = options['output'] or (
+            f'benchmark-{datetime.now():%Y%m%d-%H%M%S}-{commit or "local"}'
+            '.json'
+        )
+        Path(output).write_text(json.dumps({
+            'meta': {
+                'commit': commit,
+                'created': datetime.now().isoformat(),
+                'database': connection.vendor,
+                'requests': options['requests'],
+                'cold': options['cold'],
+                'dataset': dataset,
+            },
+            'results': results,
+        }, ensure_ascii=False, indent=2))
+        self.stdout.write(
+            self.style.SUCCESS(f'Результаты сохранены: {output}'))
+        if options['compare']:
+            self.compare(results, options['compare'])
+
+    def run_routes(self, options):
+        routes = self.get_routes(options['warmup'] + options['requests'] + 1)
+        if options['only']:
+            names = set(options['only'].split(','))
+            routes = [route for route in routes if route[0] in names]
+        results = {}
+        for name, method, url, data, auth in routes:
+            results[name] = self.measure(
+                method, url, data, auth, options)
+            self.report(name, results[name])
+        return results
+
+    def get_routes(self, total):
+        """
+        Все шаблоны и методы из api/urls.py с подставленными id из базы.
+
+        total - число запросов к каждому эндпоинту: для создания и удаления
+        заранее выбираются произведения и создаются удаляемые объекты.
+        Изменяющие эндпоинты идут последними: их изменения не сбрасывают
+        кеш до фиксации транзакции.
+        """
+        review = Review.objects.filter(comments__isnull=False).order_by(
+            '-title__score_count').first()
+        if review is None:
+            raise CommandError(
+                'Нет отзывов с комментариями, выполните '
+                'seed_benchmark_data.')
+        comment = review.comments.first()
+        title = review.title
+        category = Category.objects.first()
+        genre = Genre.objects.first()
+        user = ProjectUser.objects.exclude(username=BENCH_ADMIN).first()
+        user.confirmation_code = 1234
+        user.save(update_fields=('confirmation_code',))
+        admin = self.get_admin()
+        free_titles = list(Title.objects.exclude(
+            reviews__author=admin).values_list('id', flat=True)[
+                :total * (BENCH_BULK_SIZE + 2)])
+        if not free_titles:
+            raise CommandError('Нет произведений без отзыва bench_admin.')
+        create_titles = free_titles[:total] or free_titles
+        bulk_titles = free_titles[total:] or free_titles
+        deleted_reviews = [
+            (title_id, Review.objects.create(
+                title_id=title_id, author=admin, text='Удалить', score=5).id)
+            for title_id in free_titles[-total:]
+        ]
+        deleted_comments = [
+            Comment.objects.create(
+                review_id=review, author=admin, text='Удалить').id
+            for _ in range(total)
+        ]
+        # Уникальная часть имён и слагов создаваемых объектов.
+        run = time.time_ns()
+        deleted_titles = [
+            Title.objects.create(name='Удалить', year=2000).id
+            for _ in range(total)
+        ]
+        deleted_categories = [
+            Category.objects.create(
+                name='Удалить', slug=f'bench-c-{run}-{number}').slug
+            for number in range(total)
+        ]
+        deleted_genres = [
+            Genre.objects.create(
+                name='Удалить', slug=f'bench-g-{run}-{number}').slug
+            for number in range(total)
+        ]
+        deleted_users = [
+            ProjectUser.objects.create(
+                username=f'bench_delete_{run}_{number}',
+                email=f'bench_delete_{run}_{number}@yamdb.fake').username
+            for number in range(total)
+        ]
+
+        last_page = max(1, -(-Title.objects.count() // api_settings.PAGE_SIZE))
+        title_url = f'/api/v1/titles/{title.id}/'
+        reviews_url = f'{title_url}reviews/'
+        comments_url = f'{reviews_url}{review.id}/comments/'
+        return [
+            ('api-root', 'get', '/api/v1/', None, False),
+            ('signup', 'post', '/api/v1/auth/signup/',
+             lambda number: {
+                 'username': f'bench_signup_{time.time_ns()}_{number}',
+                 'email': f'bench_signup_{time.time_ns()}_{number}@ya.fake',
+             }, False),
+            ('token', 'post', '/api/v1/auth/token/',
+             lambda number: {
+                 'username': user.username, 'confirmation_code': 1234,
+             }, False),
+            ('users-list', 'get', '/api/v1/users/', None, True),
+            ('users-detail', 'get', f'/api/v1/users/{user.username}/',
+             None, True),
+            ('users-me', 'get', '/api/v1/users/me/', None, True),
+            ('categories-list', 'get', '/api/v1/categories/', None, False),
+            ('genres-list', 'get', '/api/v1/genres/', None, False),
+            ('titles-list', 'get', '/api/v1/titles/', None, False),
+            ('titles-list-deep', 'get', f'/api/v1/titles/?page={last_page}',
+             None, False),
+            ('titles-list-cursor', 'get', '/api/v1/titles/?cursor=',
+             None, False),
+            ('titles-filter-genre', 'get',
+             f'/api/v1/titles/?genre={genre.slug}' if genre else
+             '/api/v1/titles/', None, False),
+            ('titles-filter-category', 'get',
+             f'/api/v1/titles/?category={category.slug}' if category else
+             '/api/v1/titles/', None, False),
+            ('titles-filter-year', 'get',
+             f'/api/v1/titles/?year={title.year}', None, False),
+            ('titles-search', 'get', '/api/v1/titles/?search=побег',
+             None, False),
+            ('titles-top-rated', 'get', '/api/v1/titles/top-rated/',
+             None, False),
+            ('titles-most-reviewed', 'get', '/api/v1/titles/most-reviewed/',
+             None, False),
+            ('titles-detail', 'get', title_url, None, False),
+            ('titles-rating-distribution', 'get',
+             f'{title_url}rating-distribution/', None, False),
+            ('reviews-list', 'get', reviews_url, None, False),
+            ('reviews-list-cursor', 'get', f'{reviews_url}?cursor=',
+             None, False),
+            ('reviews-detail', 'get', f'{reviews_url}{review.id}/',
+             None, False),
+            ('comments-list', 'get', comments_url, None, False),
+            ('comments-detail', 'get', f'{comments_url}{comment.id}/',
+             None, False),
+            ('changes', 'get', '/api/v1/changes/', None, False),
+            ('changes-title', 'get', f'/api/v1/changes/?title={title.id}',
+             None, False),
+            ('auth-cache-stats', 'get', '/api/v1/auth/cache-stats/', None,
+             True),
+            ('reviews-create', 'post',
+             lambda number: '/api/v1/titles/'
+             f'{create_titles[number % len(create_titles)]}/reviews/',
+             {'text': 'Замер', 'score': 7}, True),
+            ('reviews-bulk', 'post', '/api/v1/reviews/bulk/',
+             lambda number: [
+                 {'title': title_id, 'text': 'Замер', 'score': 6}
+                 for title_id in bulk_titles[
+                     number * BENCH_BULK_SIZE % len(bulk_titles):][
+                         :BENCH_BULK_SIZE]
+             ], True),
+            ('reviews-update', 'patch', f'{reviews_url}{review.id}/',
+             {'text': 'Замер'}, True),
+            ('reviews-delete', 'delete',
+             lambda number: '/api/v1/titles/{}/reviews/{}/'.format(
+                 *deleted_reviews[number % len(deleted_reviews)]),
+             None, True),
+            ('comments-create', 'post', comments_url, {'text': 'Замер'},
+             True),
+            ('comments-update', 'patch', f'{comments_url}{comment.id}/',
+             {'text': 'Замер'}, True),
+            ('comments-delete', 'delete',
+             lambda number: f'{comments_url}'
+             f'{deleted_comments[number % len(deleted_comments)]}/',
+             None, True),
+            ('titles-create', 'post', '/api/v1/titles/',
+             lambda number: {
+                 'name': f'Замер {number}', 'year': 2000,
+                 'category': category.slug if category else None,
+                 'genre': [genre.slug] if genre else [],
+             }, True),
+            ('titles-update', 'patch', title_url, {'description': 'Замер'},
+             True),
+            ('titles-delete', 'delete',
+             lambda number: '/api/v1/titles/'
+             f'{deleted_titles[number % len(deleted_titles)]}/',
+             None, True),
+            ('categories-create', 'post', '/api/v1/categories/',
+             lambda number: {
+                 'name': 'Замер', 'slug': f'bench-cn-{run}-{number}',
+             }, True),
+            ('categories-delete', 'delete',
+             lambda number: '/api/v1/categories/'
+             f'{deleted_categories[number % len(deleted_categories)]}/',
+             None, True),
+            ('genres-create', 'post', '/api/v1/genres/',
+             lambda number: {
+                 'name': 'Замер', 'slug': f'bench-gn-{run}-{number}',
+             }, True),
+            ('genres-delete', 'delete',
+             lambda number: '/api/v1/genres/'
+             f'{deleted_genres[number % len(deleted_genres)]}/',
+             None, True),
+            ('users-create', 'post', '/api/v1/users/',
+             lambda number: {
+                 'username': f'bench_user_{run}_{number}',
+                 'email': f'bench_user_{run}_{number}@yamdb.fake',
+             }, True),
+            ('users-update', 'patch', f'/api/v1/users/{user.username}/',
+             {'bio': 'Замер'}, True),
+            ('users-delete', 'delete',
+             lambda number: '/api/v1/users/'
+             f'{deleted_users[number % len(deleted_users)]}/',
+             None, True),
+            ('users-me-update', 'patch', '/api/v1/users/me/',
+             {'bio': 'Замер'}, True),
+        ]
+
+    def get_admin(self):
+        admin, _ = ProjectUser.objects.get_or_create(
+            username=BENCH_ADMIN,
+            defaults={'email': f'{BENCH_ADMIN}@yamdb.fake', 'role': ADMIN}
+        )
+        return admin
+
+    def get_client(self, auth):
+        client = Client()
+        if auth:
+            client.defaults['HTTP_AUTHORIZATION'] = (
+                f'Bearer {RoleAccessToken.for_user(self.get_admin())}')
+        return client
+
+    def request(self, client, method, url, data, number):
+        if callable(url):
+            url = url(number)
+        payload = data(number) if callable(data) else data
+        if method == 'get':
+            return client.get(url, data=payload)
+        return getattr(client, method)(
+            url, data=json.dumps(payload),
+            content_type='application/json')
+
+    def measure(self, method, url, data, auth, options):
+        client = self.get_client(auth)
+        # Сквозной номер запроса: создающие эндпоинты берут по нему
+        # свободные произведения и объекты.
+        numbers = count()
+        for _ in range(options['warmup']):
+            self.request(client, method, url, data, next(numbers))
+
+        timings = []
+        queries = []
+        statuses = set()
+        for _ in range(options['requests']):
+            if options['cold']:
+                cache.clear()
+            counter = QueryCounter()
+            with connection.execute_wrapper(counter):
+                started = time.perf_counter()
+                response = self.request(
+                    client, method, url, data, next(numbers))
+                timings.append((time.perf_counter() - started) * 1000)
+            queries.append(counter.count)
+            statuses.add(response.status_code)
+
+        # Память меряется отдельным запросом: трассировка замедляет ответ.
+        if options['cold']:
+            cache.clear()
+        tracemalloc.start()
+        self.request(client, method, url, data, next(numbers))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return {
+            'url': url(0) if callable(url) else url,
+            'method': method.upper(),
+            'statuses': sorted(statuses),
+            'p50_ms': round(percentile(timings, 0.5), 3),
+            'p95_ms': round(percentile(timings, 0.95), 3),
+            'mean_ms': round(statistics.mean(timings), 3),
+            'max_ms': round(max(timings), 3),
+            'queries_mean': round(statistics.mean(queries), 2),
+            'queries_max': max(queries),
+            'peak_memory_kb': round(peak / 1024, 1),
+        }
+
+    def report(self, name, result):
+        self.stdout.write(
+            f'{name:<24} p50 {result["p50_ms"]:>9.2f} ms  '
+            f'p95 {result["p95_ms"]:>9.2f} ms  '
+            f'запросов {result["queries_mean"]:>6.1f}  '
+            f'память {result["peak_memory_kb"]:>8.1f} KiB  '
+            f'{result["statuses"]}'
+        )
+
+    def compare(self, results, path):
+        previous = json.loads(Path(path).read_text())['results']
+        self.stdout.write(f'Сравнение с {path}:')
+        for name, result in results.items():
+            if name not in previous:
+                continue
+            before = previous[name]
+            self.stdout.write(
+                f'{name:<24} p50 {before["p50_ms"]:>9.2f} -> '
+                f'{result["p50_ms"]:>9.2f} ms  '
+                f'p95 {before["p95_ms"]:>9.2f} -> '
+                f'{result["p95_ms"]:>9.2f} ms  '
+                f'запросов {before["queries_mean"]:>6.1f} -> '
+                f'{result["queries_mean"]:>6.1f}'
+            )
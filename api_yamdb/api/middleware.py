@@ -0,0 +1,74 @@
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from api.metrics import RequestMetrics, current_metrics
+
+logger = logging.getLogger('api.metrics')
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Эндпоинт выполнил больше запросов к базе, чем разрешено."""
+
+
+class RequestMetricsMiddleware:
+    """
+    Замеры запросов к базе, сериализации и обработки запроса.
+
+    Включается настройкой API_INSTRUMENTATION. Результат отдаётся в
+    заголовке Server-Timing и пишется в журнал api.metrics. Лимиты числа
+    запросов задаются в API_QUERY_BUDGETS по имени URL.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, 'API_INSTRUMENTATION', False):
+            return self.get_response(request)
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        view_time = time.perf_counter() - started
+
+        serializer_time = metrics.timings.get('serializer', 0.0)
+        response['Server-Timing'] = ', '.join((
+            f'db;dur={metrics.db_time * 1000:.2f};'
+            f'desc="{metrics.queries} queries"',
+            f'serializer;dur={serializer_time * 1000:.2f}',
+            f'view;dur={view_time * 1000:.2f}',
+        ))
+        url_name = getattr(request.resolver_match, 'url_name', None)
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'view': url_name,
+            'status': response.status_code,
+            'queries': metrics.queries,
+            'db_ms': round(metrics.db_time * 1000, 2),
+            'serializer_ms': round(serializer_time * 1000, 2),
+            'view_ms': round(view_time * 1000, 2),
+        }))
+        self.check_budget(url_name, metrics.queries)
+        return response
+
+    def check_budget(self, url_name, queries):
+        budget = getattr(settings, 'API_QUERY_BUDGETS', {}).get(url_name)
+        if budget is None or queries <= budget:
+            return
+        message = (f'Эндпоинт {url_name} выполнил {queries} запросов '
+                   f'к базе при лимите {budget}.')
+        if getattr(settings, 'API_ENFORCE_QUERY_BUDGETS', False):
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
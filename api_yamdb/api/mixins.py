@@ -0,0 +1,140 @@
+import hashlib
+
+from django.core.cache import cache
+from django.http import Http404
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from api.payloads import get_title_payloads
+from api_yamdb.constants import LIST_CACHE_TIMEOUT
+from reviews.cache import get_timeout, get_versions
+
+
+class VersionedListCacheMixin:
+    """
+    Кеширует ответ списка до изменения данных.
+
+    Ключ содержит версии моделей из `cache_versions`, поэтому при их
+    изменении старые ответы просто перестают запрашиваться.
+    """
+
+    cache_versions = ()
+
+    def get_list_cache_key(self, request):
+        versions = ':'.join(map(str, get_versions(*self.cache_versions)))
+        url = hashlib.md5(
+            request.build_absolute_uri().encode()).hexdigest()
+        return f'list:{self.basename}:{versions}:{url}'
+
+    def list(self, request, *args, **kwargs):
+        key = self.get_list_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = super().list(request, *args, **kwargs)
+        cache.set(key, response.data, get_timeout(LIST_CACHE_TIMEOUT))
+        return response
+
+
+class ConditionalGetMixin:
+    """
+    Условные GET-запросы по ETag.
+
+    ETag строится из счётчиков изменений `get_etag_versions()`, а не из тела
+    ответа, поэтому 304 возвращается до обращения к базе. Версии задаются
+    атрибутом `etag_versions` или, если зависят от запроса, переопределением
+    `get_etag_versions()`.
+    """
+
+    etag_versions = None
+
+    def get_etag_versions(self):
+        assert self.etag_versions is not None, (
+            f'{self.__class__.__name__} должен задать атрибут '
+            '`etag_versions` или переопределить `get_etag_versions()`.'
+        )
+        return self.etag_versions
+
+    def get_etag(self, request):
+        parts = (
+            self.basename, self.action, request.get_full_path(),
+            request.accepted_renderer.format,
+            *get_versions(*self.get_etag_versions()),
+        )
+        return quote_etag(
+            hashlib.md5(':'.join(map(str, parts)).encode()).hexdigest())
+
+    def get_last_modified(self, data):
+        """Самая поздняя дата публикации среди объектов ответа."""
+        if isinstance(data, dict):
+            items = data.get('results', [data])
+        else:
+            items = data
+        dates = [
+            parse_datetime(item['pub_date'])
+            for item in items if item.get('pub_date')
+        ]
+        return max(dates, default=None)
+
+    def get_conditional_response(self, handler, request, *args, **kwargs):
+        etag = self.get_etag(request)
+        response = get_conditional_response(request, etag=etag)
+        if response is not None:
+            response['ETag'] = etag
+            return response
+        response = handler(request, *args, **kwargs)
+        if response.status_code != status.HTTP_200_OK:
+            return response
+        response['ETag'] = etag
+        last_modified = self.get_last_modified(response.data)
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            super().retrieve, request, *args, **kwargs)
+
+
+class TitlePayloadMixin:
+    """
+    Чтение произведений из кеша представлений.
+
+    Из базы выбираются только id страницы, сами представления
+    собираются из кеша одним запросом по списку ключей.
+    """
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset()).select_related(
+            None).prefetch_related(None).defer('description')
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            page = queryset
+        data = self.get_payloads_data([title.id for title in page])
+        if self.paginator is None:
+            return Response(data)
+        return self.get_paginated_response(data)
+
+    def get_payloads_data(self, title_ids):
+        """Представления произведений в порядке title_ids."""
+        payloads = get_title_payloads(title_ids)
+        return [
+            payloads[title_id]
+            for title_id in title_ids if title_id in payloads
+        ]
+
+    def retrieve(self, request, *args, **kwargs):
+        title_id = kwargs[self.lookup_field]
+        if not str(title_id).isdigit():
+            raise Http404
+        payload = get_title_payloads([int(title_id)]).get(int(title_id))
+        if payload is None:
+            raise Http404
+        return Response(payload)
@@ -0,0 +1,219 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def is_nullable(model, name):
+    """Может ли поле сортировки (в том числе через связи) быть NULL."""
+    for part in name.split('__'):
+        try:
+            field = model._meta.get_field(part)
+        except FieldDoesNotExist:
+            # Аннотация.
+            return True
+        if field.null:
+            return True
+        model = field.related_model
+    return False
+
+
+def get_ordering_terms(model, ordering):
+    """
+    Сортировка в виде (поле, по убыванию, NULL первыми, допускает NULL).
+
+    NULL считается наименьшим значением, как в SQLite: первым по
+    возрастанию и последним по убыванию. Если в сортировке нет `id`, он
+    добавляется последним, чтобы ключ сортировки был уникальным.
+    """
+    terms = []
+    for term in ordering:
+        name = term.lstrip('-')
+        if name == 'pk':
+            name = 'id'
+        descending = term.startswith('-')
+        terms.append(
+            (name, descending, not descending, is_nullable(model, name)))
+    if 'id' not in (name for name, *_ in terms):
+        terms.append(('id', False, True, False))
+    return terms
+
+
+def get_order_expressions(terms):
+    """Выражения для order_by с явным положением NULL."""
+    return [
+        F(name).desc(nulls_first=nulls_first, nulls_last=not nulls_first)
+        if descending else
+        F(name).asc(nulls_first=nulls_first, nulls_last=not nulls_first)
+        for name, descending, nulls_first, _ in terms
+    ]
+
+
+def ordering_expressions(model, ordering):
+    return get_order_expressions(get_ordering_terms(model, ordering))
+
+
+def reverse_terms(terms):
+    return [
+        (name, not descending, not nulls_first, nullable)
+        for name, descending, nulls_first, nullable in terms
+    ]
+
+
+def get_value(obj, name):
+    for part in name.split('__'):
+        if obj is None:
+            return None
+        obj = getattr(obj, part)
+    return obj
+
+
+class OptionalCursorPagination(PageNumberPagination):
+    """
+    Постраничная пагинация с переключением на курсорную.
+
+    Если в запросе есть параметр `cursor` (в том числе пустой),
+    страница выбирается по ключу сортировки без COUNT и OFFSET. Курсор
+    хранит значения всех полей сортировки граничной записи вместе с `id`,
+    поэтому записи с одинаковым значением первого поля не пропускаются и
+    не повторяются.
+    """
+
+    cursor_query_param = 'cursor'
+    ordering = ('id',)
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = self.cursor_query_param in request.query_params
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, request, view)
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        page_size = self.get_page_size(request)
+        self.terms = get_ordering_terms(
+            queryset.model, self.get_ordering(request, queryset, view))
+        position, reverse = self.decode_cursor(request)
+        terms = reverse_terms(self.terms) if reverse else self.terms
+        queryset = queryset.order_by(*get_order_expressions(terms))
+        if position is None:
+            rows = list(queryset[:page_size + 1])
+        else:
+            rows = self.get_rows_after(
+                queryset, terms, position, page_size + 1)
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+            self.next_position = (
+                self.get_position(rows[-1]) if rows else None)
+            self.previous_position = (
+                self.get_position(rows[0]) if has_more else None)
+        else:
+            self.next_position = (
+                self.get_position(rows[-1]) if has_more else None)
+            self.previous_position = (
+                self.get_position(rows[0])
+                if position is not None and rows else None)
+        return rows
+
+    def get_ordering(self, request, queryset, view):
+        # Сортировка из фильтра сортировки представления, как в
+        # CursorPagination.
+        for backend in getattr(view, 'filter_backends', ()):
+            if hasattr(backend, 'get_ordering'):
+                ordering = backend().get_ordering(request, queryset, view)
+                if ordering:
+                    return ordering
+        return self.ordering
+
+    @staticmethod
+    def get_segments(terms, position):
+        """
+        Условия выборки записей после позиции, по порядку сортировки.
+
+        Каждое условие - равенство предыдущих полей и диапазон одного
+        поля, то есть поиск по индексу без просмотра совпадающих записей.
+        """
+        segments = []
+        for index in range(len(terms) - 1, -1, -1):
+            prefix = Q()
+            for (name, *_), value in zip(terms[:index], position):
+                prefix &= (
+                    Q(**{f'{name}__isnull': True}) if value is None
+                    else Q(**{name: value}))
+            name, descending, nulls_first, nullable = terms[index]
+            value = position[index]
+            if value is None:
+                if nulls_first:
+                    segments.append(prefix & Q(**{f'{name}__isnull': False}))
+                continue
+            lookup = 'lt' if descending else 'gt'
+            segments.append(prefix & Q(**{f'{name}__{lookup}': value}))
+            if nullable and not nulls_first:
+                segments.append(prefix & Q(**{f'{name}__isnull': True}))
+        return segments
+
+    def get_rows_after(self, queryset, terms, position, limit):
+        rows = []
+        for segment in self.get_segments(terms, position):
+            rows.extend(queryset.filter(segment)[:limit - len(rows)])
+            if len(rows) >= limit:
+                break
+        return rows
+
+    def get_position(self, obj):
+        return [get_value(obj, name) for name, *_ in self.terms]
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            data = json.loads(urlsafe_b64decode(encoded.encode()))
+            position, reverse = data['p'], bool(data['r'])
+        except (TypeError, ValueError, KeyError, BinasciiError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or (
+                len(position) != len(self.terms)):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, position, reverse):
+        data = json.dumps(
+            {'p': position, 'r': int(reverse)}, cls=DjangoJSONEncoder)
+        return replace_query_param(
+            self.base_url, self.cursor_query_param,
+            urlsafe_b64encode(data.encode()).decode())
+
+    def get_cursor_link(self, position, reverse):
+        if position is None:
+            return None
+        return self.encode_cursor(position, reverse)
+
+    def get_paginated_response(self, data):
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.get_cursor_link(self.next_position, False),
+            'previous': self.get_cursor_link(self.previous_position, True),
+            'results': data,
+        })
+
+
+class TitlePagination(OptionalCursorPagination):
+    """Пагинация произведений."""
+
+    ordering = ('id',)
+
+
+class ReviewCommentPagination(OptionalCursorPagination):
+    """Пагинация отзывов и комментариев."""
+
+    ordering = ('-pub_date', 'id')
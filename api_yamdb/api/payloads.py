@@ -0,0 +1,86 @@
+from collections import defaultdict
+
+from django.core.cache import cache
+
+from api.metrics import timer
+from api_yamdb.constants import PAYLOAD_CACHE_TIMEOUT
+from reviews.cache import TITLE_VERSION, get_timeout, get_versions
+from reviews.models import GenreTitle, Title
+
+TITLE_PAYLOAD_KEY = 'title-payload:{}:{}'
+
+
+def get_title_payload_keys(title_ids):
+    """Ключи кеша представлений с учётом версий произведений и справочников."""
+    versions = get_versions(
+        'category', 'genre',
+        *(TITLE_VERSION.format(title_id) for title_id in title_ids)
+    )
+    common = ':'.join(map(str, versions[:2]))
+    return {
+        title_id: TITLE_PAYLOAD_KEY.format(title_id, f'{version}:{common}')
+        for title_id, version in zip(title_ids, versions[2:])
+    }
+
+
+def build_title_payloads(title_ids):
+    """
+    Собирает представления произведений из базы.
+
+    Строит ту же структуру, что и TitleGetSerializer, но из плоских строк
+    values_list: один запрос на произведения и один на жанры всех
+    произведений страницы.
+    """
+    genres = defaultdict(list)
+    genre_rows = GenreTitle.objects.filter(
+        title_id__in=title_ids, genre__isnull=False
+    ).order_by('genre__name', 'genre_id').values_list(
+        'title_id', 'genre__name', 'genre__slug')
+    for title_id, name, slug in genre_rows:
+        genres[title_id].append({'name': name, 'slug': slug})
+    title_rows = Title.objects.filter(id__in=title_ids).values_list(
+        'id', 'name', 'year', 'rating', 'description',
+        'category__name', 'category__slug')
+    return {
+        title_id: {
+            'id': title_id,
+            'name': name,
+            'year': year,
+            'rating': rating,
+            'description': description,
+            'category': (
+                None if category_slug is None
+                else {'name': category_name, 'slug': category_slug}
+            ),
+            'genre': genres[title_id],
+        }
+        for (title_id, name, year, rating, description,
+             category_name, category_slug) in title_rows
+    }
+
+
+def get_title_payloads(title_ids):
+    """
+    Представления произведений по списку id.
+
+    Берутся из кеша одним запросом, недостающие собираются из базы и
+    кешируются. Несуществующие произведения в результат не попадают.
+    """
+    keys = get_title_payload_keys(title_ids)
+    cached = cache.get_many(keys.values())
+    payloads = {
+        title_id: cached[key]
+        for title_id, key in keys.items() if key in cached
+    }
+    missing = [
+        title_id for title_id in title_ids if title_id not in payloads
+    ]
+    if missing:
+        with timer('serializer'):
+            built = build_title_payloads(missing)
+        cache.set_many(
+            {keys[title_id]: data for title_id, data in built.items()},
+            get_timeout(PAYLOAD_CACHE_TIMEOUT)
+        )
+        payloads.update(built)
+    return payloads
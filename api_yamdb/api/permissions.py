@@ -1,5 +1,29 @@
 from rest_framework import permissions
 
+from api.tokens import IS_STAFF_CLAIM, ROLE_CLAIM
+from users.models import ADMIN, MODERATOR
+
+
+def get_role(request):
+    """
+    Роль и признак персонала из токена.
+
+    Для токенов без этих полей они берутся из пользователя.
+    """
+    token = request.auth
+    if token is not None and ROLE_CLAIM in token:
+        return token[ROLE_CLAIM], token.get(IS_STAFF_CLAIM, False)
+    return request.user.role, request.user.is_staff
+
+
+def is_admin(request):
+    role, is_staff = get_role(request)
+    return role == ADMIN or is_staff
+
+
+def is_moderator(request):
+    return get_role(request)[0] == MODERATOR
+
 
 class IsAdminOrReadOnly(permissions.BasePermission):
     """Администратор, или только чтение."""
@@ -8,7 +32,7 @@ class IsAdminOrReadOnly(permissions.BasePermission):
         return (
             request.method in permissions.SAFE_METHODS
             or request.user.is_authenticated
-            and request.user.is_admin
+            and is_admin(request)
         )
 
 
@@ -18,8 +42,8 @@ class IsAuthorAdminModer(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         return (
             request.method in permissions.SAFE_METHODS
-            or request.user.is_moderator
-            or request.user.is_admin
+            or is_moderator(request)
+            or is_admin(request)
             or obj.author == request.user
         )
 
@@ -31,6 +55,6 @@ class IsAdmin(permissions.IsAdminUser):
         return (
             request.user.is_authenticated
             and (
-                request.user.is_admin
+                is_admin(request)
             )
         )
@@ -1,20 +1,31 @@
 import random
 
 from django.conf import settings
-from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
-from django.core.mail import send_mail
+from django.db import IntegrityError, transaction
 from django.shortcuts import get_object_or_404
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 from rest_framework.validators import UniqueValidator
 
+from api.metrics import timer
 from api.validators import UsernameRegexValidator, username_test
 from api_yamdb.constants import FORBIDDEN_NAME, MAX_LENTH, MAX_SCORE, MIN_SCORE
-from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.models import (Category, ChangeLog, Comment, Genre, Review,
+                            Title, User)
 from reviews.validators import current_year
+from users.models import OutgoingEmail
 
 
-class UsersSerializer(serializers.ModelSerializer):
+class TimedRepresentationMixin:
+    """Учитывает время сериализации в замерах запроса."""
+
+    def to_representation(self, instance):
+        with timer('serializer'):
+            return super().to_representation(instance)
+
+
+class UsersSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
     """Сериализатор для новых юзеров."""
 
     username = serializers.CharField(
@@ -50,7 +61,6 @@ class SingUpSerializer(serializers.Serializer):
     def validate(self, data):
         username = data.get('username')
         email = data.get('email')
-        User = get_user_model()
 
         if username == FORBIDDEN_NAME:
             raise ValidationError({
@@ -67,46 +77,52 @@ class SingUpSerializer(serializers.Serializer):
                 'email': 'Емейл слишком длинный.'
             })
 
-        both_exists = User.objects.filter(
-            username=username,
-            email=email
-        ).exists()
-
-        if both_exists:
-            return data
-
-        if User.objects.filter(username=username).exists():
-            raise ValidationError({
-                'username': 'Пользователь с таким именем уже существует.'
-            })
-
-        if User.objects.filter(email=email).exists():
-            raise ValidationError({
-                'email': 'Пользователь с таким email уже существует.'
-            })
-
         return data
 
+    @transaction.atomic
     def create(self, validated_data):
         """Создание нового пользователя."""
 
-        user, created = User.objects.get_or_create(
-            username=validated_data['username'],
-            email=validated_data['email'],
-        )
-        if created:
-            user.confirmation_code = random.randrange(1000, 9999)
-            user.save()
-
-        send_mail(
-            'Код токена',
-            f'Код для получения токена {user.confirmation_code}',
-            settings.DEFAULT_FROM_EMAIL,
-            [validated_data['email']]
+        # Пользователь и письмо сохраняются в одной транзакции: без письма
+        # пользователь не создаётся. Уникальность проверяется
+        # ограничениями базы при вставке.
+        try:
+            with transaction.atomic():
+                user = User.objects.create(
+                    username=validated_data['username'],
+                    email=validated_data['email'],
+                    confirmation_code=random.randrange(1000, 9999),
+                )
+        except IntegrityError as error:
+            user = self.get_existing_user(validated_data, error)
+
+        # Письмо отправит команда send_outbox_emails.
+        OutgoingEmail.objects.create(
+            subject='Код токена',
+            body=f'Код для получения токена {user.confirmation_code}',
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            recipient=validated_data['email'],
         )
 
         return user
 
+    def get_existing_user(self, validated_data, error):
+        """Зарегистрированный пользователь с теми же username и email."""
+        user = User.objects.filter(
+            username=validated_data['username']).first()
+        if user is None:
+            if not User.objects.filter(
+                    email=validated_data['email']).exists():
+                raise error
+            raise serializers.ValidationError({
+                'email': ['Пользователь с таким email уже существует.']
+            })
+        if user.email != validated_data['email']:
+            raise serializers.ValidationError({
+                'username': ['Пользователь с таким именем уже существует.']
+            })
+        return user
+
 
 class GetTokenSerializer(serializers.Serializer):
     """Сериализатор для получения токена при регистрации."""
@@ -129,7 +145,8 @@ class GetTokenSerializer(serializers.Serializer):
         return data
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedRepresentationMixin,
+                         serializers.ModelSerializer):
     """Категории."""
 
     class Meta:
@@ -137,7 +154,8 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = ('name', 'slug',)
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(TimedRepresentationMixin,
+                      serializers.ModelSerializer):
     """Жанры."""
 
     class Meta:
@@ -145,7 +163,8 @@ class GenreSerializer(serializers.ModelSerializer):
         fields = ('name', 'slug',)
 
 
-class TitleGetSerializer(serializers.ModelSerializer):
+class TitleGetSerializer(TimedRepresentationMixin,
+                         serializers.ModelSerializer):
     """Для GET-запросов произведений."""
 
     category = CategorySerializer(read_only=True)
@@ -177,7 +196,8 @@ class TitleSerializer(TitleGetSerializer):
         return TitleGetSerializer(instance).data
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(TimedRepresentationMixin,
+                       serializers.ModelSerializer):
     """Сериализатор для отзывов."""
 
     author = serializers.SlugRelatedField(
@@ -187,7 +207,8 @@ class ReviewSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Review
-        fields = ('id', 'text', 'author', 'score', 'pub_date')
+        fields = ('id', 'text', 'author', 'score', 'pub_date',
+                  'comments_count')
 
     def validate_score(self, value):
         """Проверка на корректность оценки."""
@@ -199,21 +220,34 @@ class ReviewSerializer(serializers.ModelSerializer):
             )
         return value
 
-    def validate(self, data):
-        if (
-            self.context['request'].method == 'POST'
-            and Review.objects.filter(
-                author=self.context.get('request').user,
-                title=self.context['view'].kwargs['title_id']
-            ).exists()
-        ):
-            raise serializers.ValidationError(
-                'Вы не можете дважды дать отзыв на одно произведение.'
-            )
-        return data
+    def create(self, validated_data):
+        # Повторный отзыв отсекает ограничение one_review_per_author.
+        try:
+            return super().create(validated_data)
+        except IntegrityError:
+            if not Review.objects.filter(
+                author=validated_data['author'],
+                title=validated_data['title']
+            ).exists():
+                raise
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Вы не можете дважды дать отзыв на одно произведение.'
+                ]
+            })
+
+
+class ReviewBulkSerializer(ReviewSerializer):
+    """Отзыв в пакетной загрузке."""
 
+    title = serializers.IntegerField(source='title_id')
 
-class CommentSerializer(serializers.ModelSerializer):
+    class Meta(ReviewSerializer.Meta):
+        fields = ReviewSerializer.Meta.fields + ('title',)
+
+
+class CommentSerializer(TimedRepresentationMixin,
+                        serializers.ModelSerializer):
     """Сериализатор для комментариев к отзывам."""
 
     author = serializers.SlugRelatedField(
@@ -224,3 +258,22 @@ class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = ('id', 'text', 'author', 'pub_date')
+
+
+class ChangeLogSerializer(serializers.ModelSerializer):
+    """Запись журнала изменений с текущим видом объекта."""
+
+    seq = serializers.IntegerField(source='id')
+    type = serializers.CharField(source='content_type')
+    id = serializers.IntegerField(source='object_id')
+    title = serializers.IntegerField(source='title_id')
+    review = serializers.IntegerField(source='review_id')
+    data = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ChangeLog
+        fields = ('seq', 'type', 'action', 'id', 'title', 'review', 'data')
+
+    def get_data(self, obj):
+        """Объект из контекста; для удалённых - None."""
+        return self.context['objects'].get((obj.content_type, obj.object_id))
@@ -0,0 +1,172 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+from api_yamdb.constants import THROTTLE_LOCAL_STORE_SIZE
+
+# Корзина токенов в Redis: пополнение, списание и срок жизни ключа одной
+# атомарной операцией. Время берётся у сервера Redis, а не у процессов, чьи
+# часы могут расходиться; запись после TIME требует Redis 5 и новее.
+# Время ожидания возвращается строкой: числа Lua Redis округляет до целых.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1]) or capacity
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate))
+return tostring(wait)
+"""
+
+
+class LocalMemoryStore:
+    """
+    Корзины токенов в памяти процесса.
+
+    Подходит для одного процесса и для тестов. При переполнении вытесняются
+    давно не использованные корзины, то есть скорее всего уже полные.
+    """
+
+    def __init__(self, maxsize=THROTTLE_LOCAL_STORE_SIZE):
+        self.maxsize = maxsize
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def consume(self, key, capacity, rate):
+        """Списывает токен; возвращает 0 или время ожидания, сек."""
+        now = time.monotonic()
+        with self.lock:
+            tokens, updated = self.buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            wait = 0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate
+            self.buckets[key] = (tokens, now)
+            self.buckets.move_to_end(key)
+            while len(self.buckets) > self.maxsize:
+                self.buckets.popitem(last=False)
+        return wait
+
+    def clear(self):
+        with self.lock:
+            self.buckets.clear()
+
+
+class RedisStore:
+    """Корзины токенов в Redis, общие для всех процессов."""
+
+    def __init__(self, url='redis://localhost:6379/0', prefix='throttle:'):
+        try:
+            import redis
+        except ImportError:
+            raise ImproperlyConfigured(
+                'Для RedisStore установите пакет redis.')
+        self.prefix = prefix
+        self.client = redis.Redis.from_url(url)
+        self.script = self.client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def consume(self, key, capacity, rate):
+        return float(self.script(
+            keys=(self.prefix + key,), args=(capacity, rate)))
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.prefix + '*'))
+        if keys:
+            self.client.delete(*keys)
+
+
+store = None
+
+
+def get_store():
+    """Хранилище из настройки THROTTLE_STORE, создаётся один раз."""
+    global store
+    if store is None:
+        config = getattr(settings, 'THROTTLE_STORE', {})
+        backend = import_string(config.get(
+            'BACKEND', 'api.throttling.LocalMemoryStore'))
+        store = backend(**config.get('OPTIONS', {}))
+    return store
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Ограничение частоты запросов корзиной токенов.
+
+    Частота из DEFAULT_THROTTLE_RATES задаёт ёмкость корзины и скорость её
+    пополнения. Проверка - одна атомарная операция хранилища вместо списка
+    времён запросов в кеше.
+    """
+
+    def get_rate(self):
+        # Частоты читаются из настроек при каждой проверке, чтобы их можно
+        # было переопределить (замеры benchmark_api, тесты).
+        try:
+            return api_settings.DEFAULT_THROTTLE_RATES[self.scope]
+        except KeyError:
+            raise ImproperlyConfigured(
+                f'Не задана частота запросов для области {self.scope}.')
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+        capacity, duration = self.num_requests, self.duration
+        self.retry_after = get_store().consume(
+            key, capacity, capacity / duration)
+        return not self.retry_after
+
+    def wait(self):
+        return self.retry_after
+
+
+class SignUpThrottle(TokenBucketThrottle):
+    """Регистрация: по адресу клиента."""
+
+    scope = 'signup'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class TokenThrottle(SignUpThrottle):
+    """Получение токена: по адресу клиента."""
+
+    scope = 'token'
+
+
+class WriteThrottle(TokenBucketThrottle):
+    """Изменение отзывов и комментариев: по пользователю."""
+
+    scope = 'write'
+
+    def get_cache_key(self, request, view):
+        if request.method in SAFE_METHODS:
+            return None
+        if request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
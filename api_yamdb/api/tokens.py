@@ -0,0 +1,148 @@
+import hashlib
+import math
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api_yamdb.constants import (TOKEN_REVOCATION_ERROR_RATE,
+                                 TOKEN_REVOCATION_MIN_CAPACITY,
+                                 TOKEN_REVOCATION_REFRESH_INTERVAL)
+from users.models import RevokedToken
+
+User = get_user_model()
+
+ROLE_CLAIM = 'role'
+IS_STAFF_CLAIM = 'is_staff'
+TOKEN_VERSION_CLAIM = 'ver'
+USER_VERSION_KEY = 'user:{}:{}'
+
+
+class RoleAccessToken(AccessToken):
+    """Токен доступа с ролью пользователя и версией его токенов."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token[ROLE_CLAIM] = user.role
+        token[IS_STAFF_CLAIM] = user.is_staff
+        token[TOKEN_VERSION_CLAIM] = user.token_version
+        return token
+
+
+class BloomFilter:
+    """Фильтр Блума по строковым ключам."""
+
+    def __init__(self, capacity, error_rate):
+        self.size = math.ceil(
+            -capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'big')
+        second = int.from_bytes(digest[8:], 'big') | 1
+        return (
+            (first + number * second) % self.size
+            for number in range(self.hash_count)
+        )
+
+    def add(self, key):
+        for position in self.positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self.positions(key)
+        )
+
+
+def get_token_key(user_id, version):
+    return USER_VERSION_KEY.format(user_id, version)
+
+
+class RevocationFilter:
+    """
+    Отозванные токены в памяти процесса.
+
+    Фильтр перечитывается из базы раз в интервал, отзывы этого процесса
+    попадают в него сразу. База проверяется только при попадании в фильтр,
+    чтобы исключить ложные срабатывания.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        """Пустой фильтр без перечитывания до конца интервала."""
+        self.bloom = self.create_filter(())
+        self.refreshed = time.monotonic()
+
+    @staticmethod
+    def create_filter(keys):
+        bloom = BloomFilter(
+            max(len(keys) * 2, TOKEN_REVOCATION_MIN_CAPACITY),
+            TOKEN_REVOCATION_ERROR_RATE)
+        for key in keys:
+            bloom.add(key)
+        return bloom
+
+    def refresh(self):
+        keys = list(RevokedToken.objects.filter(
+            expires_at__gt=timezone.now()).values_list('key', flat=True))
+        self.bloom = self.create_filter(keys)
+        self.refreshed = time.monotonic()
+
+    def get_filter(self):
+        if time.monotonic() - self.refreshed > self.interval:
+            with self.lock:
+                if time.monotonic() - self.refreshed > self.interval:
+                    self.refresh()
+        return self.bloom
+
+    def add(self, key):
+        self.bloom.add(key)
+
+    def is_revoked(self, token):
+        user_id = token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return False
+        # Токены без версии выданы до её появления и считаются версией 0.
+        key = get_token_key(user_id, token.get(TOKEN_VERSION_CLAIM, 0))
+        return key in self.get_filter() and RevokedToken.objects.filter(
+            key=key, expires_at__gt=timezone.now()).exists()
+
+
+revoked_tokens = RevocationFilter(TOKEN_REVOCATION_REFRESH_INTERVAL)
+
+
+def revoke_user_tokens(user_id, version):
+    """Отзывает токены пользователя с указанной версией."""
+    now = timezone.now()
+    key = get_token_key(user_id, version)
+    RevokedToken.objects.filter(expires_at__lte=now).delete()
+    RevokedToken.objects.update_or_create(key=key, defaults={
+        'expires_at': now + api_settings.ACCESS_TOKEN_LIFETIME})
+    transaction.on_commit(lambda: revoked_tokens.add(key))
+
+
+@receiver(post_save, sender=User)
+def revoke_downgraded_user_tokens(sender, instance, **kwargs):
+    """Отзывает токены пользователя, у которого понизился доступ."""
+    if instance.revoked_token_version is not None:
+        revoke_user_tokens(instance.pk, instance.revoked_token_version)
+
+
+@receiver(post_delete, sender=User)
+def revoke_deleted_user_tokens(sender, instance, **kwargs):
+    revoke_user_tokens(instance.pk, instance.token_version)
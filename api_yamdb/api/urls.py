@@ -2,9 +2,12 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
 from api.views import (
+    AuthCacheStats,
     CategoryViewSet,
+    ChangeLogView,
     CommentViewSet,
     GenreViewSet,
+    ReviewBulkCreate,
     ReviewViewSet,
     TitleViewSet,
     UserGetToken,
@@ -32,9 +35,13 @@ v1_router.register(
 auth_urls = [
     path('signup/', UserSignUp.as_view()),
     path('token/', UserGetToken.as_view()),
+    path('cache-stats/', AuthCacheStats.as_view(), name='auth-cache-stats'),
 ]
 
 urlpatterns = [
     path("v1/auth/", include(auth_urls)),
+    path('v1/reviews/bulk/', ReviewBulkCreate.as_view(),
+         name='reviews-bulk'),
+    path('v1/changes/', ChangeLogView.as_view(), name='changes'),
     path('v1/', include(v1_router.urls)),
 ]
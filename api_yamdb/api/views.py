@@ -1,22 +1,48 @@
-from django.db.models import Avg
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db import IntegrityError, connection, transaction
+from django.http import Http404
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import (filters, mixins, permissions, response, status,
                             views, viewsets)
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import AllowAny, IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 
-from api.filters import TitleManyFilters
+from api.authentication import local_users, verified_tokens
+from api.filters import TitleManyFilters, TitleOrderingFilter
+from api.mixins import (ConditionalGetMixin, TitlePayloadMixin,
+                        VersionedListCacheMixin)
+from api.pagination import ReviewCommentPagination, TitlePagination
 from api.permissions import IsAdmin, IsAdminOrReadOnly, IsAuthorAdminModer
-from api.serializers import (CategorySerializer, CommentSerializer,
-                             GenreSerializer, GetTokenSerializer,
+from api.serializers import (CategorySerializer, ChangeLogSerializer,
+                             CommentSerializer, GenreSerializer,
+                             GetTokenSerializer, ReviewBulkSerializer,
                              ReviewSerializer, SingUpSerializer,
                              TitleGetSerializer, TitleSerializer,
                              UsersSerializer)
-from reviews.models import Category, Genre, Review, Title, User
+from api.throttling import SignUpThrottle, TokenThrottle, WriteThrottle
+from api.tokens import RoleAccessToken
+from api_yamdb.constants import (CHANGES_MAX_PAGE_SIZE, CHANGES_PAGE_SIZE,
+                                 CHANGES_SAFETY_WINDOW,
+                                 LEADERBOARD_MIN_REVIEWS, LEADERBOARD_SIZE,
+                                 MAX_SCORE, MIN_SCORE, REVIEW_BULK_MAX_SIZE)
+from reviews.cache import (COMMENTS_VERSION, REVIEWS_VERSION, TITLE_VERSION,
+                           TITLES_VERSION, USERS_VERSION,
+                           bump_review_versions)
+from reviews.models import (Category, ChangeLog, Comment, Genre, Review,
+                            Title, TitleScore, User)
+
+
+def parse_id(value):
+    """Идентификатор из URL в каноническом виде."""
+    return int(value) if str(value).isdigit() else value
 
 
 class UsersViewSet(viewsets.ModelViewSet):
@@ -40,6 +66,10 @@ class UsersViewSet(viewsets.ModelViewSet):
     def me(self, request):
         user = request.user
         if request.method == 'PATCH':
+            # Пользователь запроса может быть из кеша аутентификации:
+            # изменения пишутся поверх актуальной строки, иначе сохранение
+            # вернуло бы прежние роль и версию токенов.
+            user = User.objects.get(pk=user.pk)
             serializer = UsersSerializer(
                 user, data=request.data.copy(), partial=True
             )
@@ -58,6 +88,7 @@ class UserSignUp(views.APIView):
     """Функция регистрации новых пользователей."""
 
     serializer_class = SingUpSerializer
+    throttle_classes = (SignUpThrottle,)
 
     def post(self, request):
         serializer = self.serializer_class(data=request.data)
@@ -73,6 +104,7 @@ class UserGetToken(APIView):
     """Вью-класс получения токена по username и confirmation_code."""
 
     permission_classes = (AllowAny,)
+    throttle_classes = (TokenThrottle,)
 
     def post(self, request):
         """Функция получения токена при регистрации."""
@@ -83,13 +115,26 @@ class UserGetToken(APIView):
             User,
             username=serializer.validated_data['username']
         )
-        token = AccessToken.for_user(user)
+        token = RoleAccessToken.for_user(user)
         return Response({'token': str(token)}, status=status.HTTP_200_OK)
 
 
+class AuthCacheStats(APIView):
+    """Счётчики кешей аутентификации процесса для мониторинга."""
+
+    permission_classes = (IsAdmin,)
+
+    def get(self, request):
+        return Response({
+            'tokens': verified_tokens.stats(),
+            'users': local_users.stats(),
+        })
+
+
 class CategoryGenreViewset(
-        viewsets.GenericViewSet, mixins.ListModelMixin,
-        mixins.CreateModelMixin, mixins.DestroyModelMixin):
+        VersionedListCacheMixin, viewsets.GenericViewSet,
+        mixins.ListModelMixin, mixins.CreateModelMixin,
+        mixins.DestroyModelMixin):
     """Базовый сет для категорий и жанров."""
 
     permission_classes = (IsAdminOrReadOnly,)
@@ -103,6 +148,7 @@ class CategoryViewSet(CategoryGenreViewset):
 
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    cache_versions = ('category',)
 
 
 class GenreViewSet(CategoryGenreViewset):
@@ -110,18 +156,21 @@ class GenreViewSet(CategoryGenreViewset):
 
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    cache_versions = ('genre',)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(ConditionalGetMixin, TitlePayloadMixin,
+                   viewsets.ModelViewSet):
     """Произведения."""
 
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score')).order_by('name').select_related(
-            'category').prefetch_related('genre').all()
+    queryset = Title.objects.order_by('name').select_related(
+        'category').prefetch_related('genre').all()
     permission_classes = (IsAdminOrReadOnly,)
-    filter_backends = (DjangoFilterBackend, filters.OrderingFilter)
+    filter_backends = (DjangoFilterBackend, TitleOrderingFilter)
     filterset_class = TitleManyFilters
-    ordering_fields = ('name', 'year', 'category')
+    pagination_class = TitlePagination
+    ordering_fields = (
+        'name', 'year', 'category', 'rating', 'reviews_count')
     ordering = ('id',)
     http_method_names = ('get', 'post', 'patch', 'delete')
 
@@ -131,42 +180,324 @@ class TitleViewSet(viewsets.ModelViewSet):
             return TitleGetSerializer
         return TitleSerializer
 
-
-class ReviewViewSet(viewsets.ModelViewSet):
+    @action(detail=True, url_path='rating-distribution')
+    def rating_distribution(self, request, pk=None):
+        """Количество отзывов с каждой оценкой произведения."""
+        return self.get_conditional_response(
+            self.get_rating_distribution, request, pk=pk)
+
+    def get_rating_distribution(self, request, pk=None):
+        title_id = parse_id(pk)
+        if not isinstance(title_id, int):
+            raise Http404
+        counts = dict(TitleScore.objects.filter(
+            title_id=title_id).values_list('score', 'count'))
+        if not counts and not Title.objects.filter(pk=title_id).exists():
+            raise Http404
+        return Response({
+            'count': sum(counts.values()),
+            'distribution': [
+                {'score': score, 'count': counts.get(score, 0)}
+                for score in range(MIN_SCORE, MAX_SCORE + 1)
+            ],
+        })
+
+    @action(detail=False, url_path='top-rated')
+    def top_rated(self, request):
+        """Произведения с наибольшим рейтингом."""
+        return self.get_conditional_response(
+            self.get_leaderboard, request,
+            ordering=('-rating', '-score_count', 'id'))
+
+    @action(detail=False, url_path='most-reviewed')
+    def most_reviewed(self, request):
+        """Произведения с наибольшим числом отзывов."""
+        return self.get_conditional_response(
+            self.get_leaderboard, request,
+            ordering=('-score_count', '-rating', 'id'))
+
+    def get_leaderboard(self, request, ordering):
+        # Фильтры category и genre дают рейтинги категорий и жанров.
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            score_count__gte=LEADERBOARD_MIN_REVIEWS).order_by(*ordering)
+        title_ids = list(
+            queryset.values_list('id', flat=True)[:LEADERBOARD_SIZE])
+        return Response(self.get_payloads_data(title_ids))
+
+    def get_etag_versions(self):
+        if not self.detail:
+            title_version = TITLES_VERSION
+        else:
+            title_version = TITLE_VERSION.format(
+                parse_id(self.kwargs[self.lookup_field]))
+        return (title_version, 'category', 'genre')
+
+
+class ReviewViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """Обзоры на произведения."""
 
     serializer_class = ReviewSerializer
     permission_classes = (
         IsAuthorAdminModer, IsAuthenticatedOrReadOnly)
+    pagination_class = ReviewCommentPagination
+    throttle_classes = (WriteThrottle,)
     http_method_names = ('get', 'post', 'patch', 'delete')
 
     def get_title(self):
-        return get_object_or_404(Title, id=self.kwargs.get('title_id'))
+        """Произведение из URL, запрашивается один раз за запрос."""
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title.objects.only('id'), id=self.kwargs.get('title_id'))
+        return self._title
+
+    def get_etag_versions(self):
+        return (
+            REVIEWS_VERSION.format(parse_id(self.kwargs['title_id'])),
+            USERS_VERSION,
+        )
 
     def get_queryset(self):
-        return self.get_title().reviews.all()
+        return self.get_title().reviews.select_related('author')
 
     def perform_create(self, serializer):
         serializer.save(title=self.get_title(), author=self.request.user)
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class ReviewBulkCreate(APIView):
+    """
+    Пакетная загрузка отзывов на разные произведения.
+
+    Отзывы проверяются вместе, вставляются одним bulk_create, а агрегаты
+    оценок пересчитываются один раз на каждое произведение. Ответ содержит
+    результат для каждого отзыва в порядке запроса.
+    """
+
+    permission_classes = (permissions.IsAuthenticated,)
+    throttle_classes = (WriteThrottle,)
+
+    def post(self, request):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+                'Передайте непустой список отзывов.']})
+        if len(items) > REVIEW_BULK_MAX_SIZE:
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+                f'Не больше {REVIEW_BULK_MAX_SIZE} отзывов в запросе.']})
+        results = [None] * len(items)
+        reviews = self.validate_items(request.user, items, results)
+        if reviews:
+            try:
+                self.create_reviews(request.user, reviews)
+            except IntegrityError:
+                # Отзыв добавлен параллельным запросом после проверки.
+                return Response(
+                    {api_settings.NON_FIELD_ERRORS_KEY: [
+                        'Отзывы изменились во время загрузки, '
+                        'повторите запрос.']},
+                    status=status.HTTP_409_CONFLICT
+                )
+            for index, review in reviews.items():
+                results[index] = {
+                    'status': status.HTTP_201_CREATED,
+                    'review': ReviewBulkSerializer(review).data,
+                }
+        if not reviews:
+            response_status = status.HTTP_400_BAD_REQUEST
+        elif len(reviews) == len(items):
+            response_status = status.HTTP_201_CREATED
+        else:
+            response_status = status.HTTP_207_MULTI_STATUS
+        return Response(
+            {'created': len(reviews), 'results': results},
+            status=response_status
+        )
+
+    def validate_items(self, user, items, results):
+        """Отзывы для вставки по номерам; ошибки пишутся в results."""
+        valid = {}
+        for index, item in enumerate(items):
+            serializer = ReviewBulkSerializer(data=item)
+            if serializer.is_valid():
+                valid[index] = serializer.validated_data
+            else:
+                results[index] = {
+                    'status': status.HTTP_400_BAD_REQUEST,
+                    'errors': serializer.errors,
+                }
+        title_ids = {data['title_id'] for data in valid.values()}
+        existing = set(Title.objects.filter(
+            id__in=title_ids).order_by().values_list('id', flat=True))
+        reviewed = set(Review.objects.filter(
+            author=user, title_id__in=title_ids
+        ).order_by().values_list('title_id', flat=True))
+        reviews = {}
+        for index, data in valid.items():
+            if data['title_id'] not in existing:
+                results[index] = {
+                    'status': status.HTTP_404_NOT_FOUND,
+                    'errors': {'title': ['Произведение не найдено.']},
+                }
+            elif data['title_id'] in reviewed:
+                results[index] = {
+                    'status': status.HTTP_400_BAD_REQUEST,
+                    'errors': {api_settings.NON_FIELD_ERRORS_KEY: [
+                        'Вы не можете дважды дать отзыв на одно '
+                        'произведение.']},
+                }
+            else:
+                reviewed.add(data['title_id'])
+                reviews[index] = Review(author=user, **data)
+        return reviews
+
+    @transaction.atomic
+    def create_reviews(self, user, reviews):
+        Review.objects.bulk_create(reviews.values())
+        title_ids = {review.title_id for review in reviews.values()}
+        if any(review.pk is None for review in reviews.values()):
+            # Не все базы возвращают id из bulk_create.
+            ids = dict(Review.objects.filter(
+                author=user, title_id__in=title_ids
+            ).order_by().values_list('title_id', 'id'))
+            for review in reviews.values():
+                review.pk = ids[review.title_id]
+        # Массовая вставка идёт в обход сигналов: агрегаты сдвигаются на
+        # суммы пакета, как при одиночных отзывах, без пересчёта по всем
+        # отзывам произведения.
+        counts = Counter(
+            (review.title_id, review.score) for review in reviews.values())
+        title_scores = defaultdict(lambda: [0, 0])
+        for (title_id, score), count in counts.items():
+            title_scores[title_id][0] += score * count
+            title_scores[title_id][1] += count
+        for title_id, (score_sum, score_count) in title_scores.items():
+            Title.objects.filter(pk=title_id).change_scores(
+                score_sum, score_count)
+        TitleScore.objects.add_counts(counts)
+        ChangeLog.objects.bulk_create(
+            ChangeLog(
+                content_type=ChangeLog.REVIEW, object_id=review.pk,
+                action=ChangeLog.CREATED, title_id=review.title_id)
+            for review in reviews.values()
+        )
+        bump_review_versions(*title_ids)
+
+
+class ChangeLogView(APIView):
+    """
+    Изменения отзывов и комментариев после порядкового номера `since`.
+
+    Для каждого объекта отдаётся только последнее изменение из выборки,
+    удалённые объекты приходят без данных. Значение `next_since` передаётся
+    в следующий запрос.
+
+    Номера выдаются при вставке, а видны после фиксации транзакции, поэтому
+    при параллельной записи запись с меньшим номером может появиться позже
+    записи с бо́льшим. В SQLite записи выполняются по очереди и такого не
+    бывает, в других базах журнал отдаётся с отставанием на
+    CHANGES_SAFETY_WINDOW секунд.
+    """
+
+    permission_classes = (AllowAny,)
+
+    def get(self, request):
+        since = self.get_number(request, 'since', 0)
+        limit = min(
+            self.get_number(request, 'limit', CHANGES_PAGE_SIZE) or 1,
+            CHANGES_MAX_PAGE_SIZE
+        )
+        changes = ChangeLog.objects.filter(id__gt=since)
+        window = self.get_safety_window()
+        if window:
+            # Выборка заканчивается перед первой слишком свежей записью,
+            # чтобы не перескочить ещё не зафиксированные.
+            fresh_id = ChangeLog.objects.filter(
+                id__gt=since,
+                created_at__gt=timezone.now() - timedelta(seconds=window)
+            ).values_list('id', flat=True).first()
+            if fresh_id is not None:
+                changes = changes.filter(id__lt=fresh_id)
+        if 'title' in request.query_params:
+            changes = changes.filter(
+                title_id=self.get_number(request, 'title', 0))
+        changes = list(changes[:limit + 1])
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+        latest = {}
+        for change in changes:
+            key = (change.content_type, change.object_id)
+            latest.pop(key, None)
+            latest[key] = change
+        return Response({
+            'results': ChangeLogSerializer(
+                latest.values(), many=True,
+                context={'objects': self.get_objects(latest.values())}
+            ).data,
+            'next_since': changes[-1].id if changes else since,
+            'has_more': has_more,
+        })
+
+    @staticmethod
+    def get_safety_window():
+        """Отставание журнала от текущего момента, сек."""
+        if connection.vendor == 'sqlite':
+            return 0
+        return CHANGES_SAFETY_WINDOW
+
+    @staticmethod
+    def get_number(request, name, default):
+        value = request.query_params.get(name, default)
+        if not str(value).isdigit():
+            raise ValidationError(
+                {name: ['Ожидается неотрицательное целое число.']})
+        return int(value)
+
+    def get_objects(self, changes):
+        """Текущие представления неудалённых объектов по типу и id."""
+        ids = {ChangeLog.REVIEW: set(), ChangeLog.COMMENT: set()}
+        for change in changes:
+            if change.action != ChangeLog.DELETED:
+                ids[change.content_type].add(change.object_id)
+        objects = {}
+        for content_type, model, serializer_class in (
+            (ChangeLog.REVIEW, Review, ReviewSerializer),
+            (ChangeLog.COMMENT, Comment, CommentSerializer),
+        ):
+            if not ids[content_type]:
+                continue
+            for obj in model.objects.filter(
+                    id__in=ids[content_type]).select_related('author'):
+                objects[content_type, obj.id] = serializer_class(obj).data
+        return objects
+
+
+class CommentViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """Комментарии к обзорам на произведения."""
 
     serializer_class = CommentSerializer
     permission_classes = (
         IsAuthorAdminModer, IsAuthenticatedOrReadOnly)
+    pagination_class = ReviewCommentPagination
+    throttle_classes = (WriteThrottle,)
     http_method_names = ('get', 'post', 'patch', 'delete')
 
     def get_review(self):
-        return get_object_or_404(
-            Review,
-            id=self.kwargs.get('review_id'),
-            title__id=self.kwargs.get('title_id')
-        )
+        """Отзыв из URL, запрашивается один раз за запрос."""
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review.objects.only('id', 'title_id'),
+                id=self.kwargs.get('review_id'),
+                title_id=self.kwargs.get('title_id')
+            )
+        return self._review
 
     def get_queryset(self):
-        return self.get_review().comments.all()
+        return self.get_review().comments.select_related('author')
+
+    def get_etag_versions(self):
+        return (
+            COMMENTS_VERSION.format(parse_id(self.kwargs['review_id'])),
+            USERS_VERSION,
+        )
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user, review_id=self.get_review())
@@ -27,14 +27,67 @@ USERS = 'users.csv'
 COMMENTS = 'comments.csv'
 REVIEW = 'review.csv'
 
+# Порядок загрузки: родительские таблицы раньше зависимых.
 DATA_FILES_CSV = [
     CATEGORY,
     GENRE,
+    USERS,
     TITLES,
     GENRE_TITLE,
-    USERS,
-    COMMENTS,
     REVIEW,
+    COMMENTS,
+]
+# Этапы параллельной загрузки: файлы этапа не зависят друг от друга.
+IMPORT_STAGES_CSV = [
+    (CATEGORY, GENRE, USERS),
+    (TITLES,),
+    (GENRE_TITLE, REVIEW),
+    (COMMENTS,),
 ]
+# Большие файлы загружаются частями в нескольких процессах.
+CHUNKED_FILES_CSV = (REVIEW, COMMENTS)
 
 STATIC_PATH = '/static/data/'
+IMPORT_BATCH_SIZE = 5000
+IMPORT_CHUNK_SIZE = 50000
+
+# Наибольшее время жизни ключей кеша, если он не общий для процессов, сек.
+LOCAL_CACHE_TIMEOUT = 60
+# Время жизни закешированных ответов списков, сек.
+LIST_CACHE_TIMEOUT = 60 * 60 * 24
+# Время жизни закешированных представлений произведений, сек.
+PAYLOAD_CACHE_TIMEOUT = 60 * 60 * 24
+# Наибольшее число отзывов в одном пакетном запросе.
+REVIEW_BULK_MAX_SIZE = 500
+# Кеш пользователей для JWT-аутентификации: время жизни в общем кеше и в
+# памяти процесса, сек., и число пользователей в памяти процесса.
+AUTH_USER_CACHE_TIMEOUT = 60 * 5
+AUTH_USER_LOCAL_CACHE_TIMEOUT = 5
+AUTH_USER_LOCAL_CACHE_SIZE = 1024
+# Кеш проверенных токенов в памяти процесса: число токенов и наибольшее
+# время жизни, сек. (не дольше срока действия токена).
+AUTH_TOKEN_CACHE_SIZE = 4096
+AUTH_TOKEN_CACHE_TIMEOUT = 60 * 5
+# Наибольшее число корзин ограничения частоты запросов в памяти процесса.
+THROTTLE_LOCAL_STORE_SIZE = 100000
+# Очередь писем: размер пачки, число попыток, задержка перед первым
+# повтором (затем удваивается) и пауза между проверками очереди, сек.
+OUTBOX_BATCH_SIZE = 100
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_RETRY_DELAY = 60
+OUTBOX_POLL_INTERVAL = 5
+# Фильтр отозванных токенов: период перечитывания из базы, сек., доля
+# ложных срабатываний и наименьшая ёмкость.
+TOKEN_REVOCATION_REFRESH_INTERVAL = 30
+TOKEN_REVOCATION_ERROR_RATE = 0.01
+TOKEN_REVOCATION_MIN_CAPACITY = 1024
+# Записей журнала изменений в ответе: по умолчанию и наибольшее.
+CHANGES_PAGE_SIZE = 100
+CHANGES_MAX_PAGE_SIZE = 1000
+# Отставание журнала изменений вне SQLite, сек.: дольше транзакции записи
+# идти не должны. Срок хранения записей журнала, дней.
+CHANGES_SAFETY_WINDOW = 5
+CHANGES_RETENTION_DAYS = 30
+# Размер рейтингов произведений и минимум отзывов для попадания в них.
+LEADERBOARD_SIZE = 50
+LEADERBOARD_MIN_REVIEWS = 3
@@ -27,6 +27,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -36,6 +37,26 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Замеры запросов: заголовок Server-Timing и журнал api.metrics.
+API_INSTRUMENTATION = False
+# Лимиты числа запросов к базе по имени URL.
+API_QUERY_BUDGETS = {
+    'category-list': 2,
+    'genre-list': 2,
+    'title-list': 4,
+    'title-detail': 3,
+    'title-rating-distribution': 2,
+    'title-top-rated': 3,
+    'title-most-reviewed': 3,
+    'reviews-list': 4,
+    'reviews-detail': 3,
+    'comments-list': 4,
+    'comments-detail': 3,
+    'reviews-bulk': 13,
+}
+# Превышение лимита: исключение (для тестов) или предупреждение в журнале.
+API_ENFORCE_QUERY_BUDGETS = False
+
 ROOT_URLCONF = 'api_yamdb.urls'
 
 TEMPLATES_DIR = BASE_DIR / 'templates'
@@ -61,9 +82,32 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Параллельная загрузка CSV ждёт освобождения базы, а не падает.
+        'OPTIONS': {'timeout': 30},
     }
 }
 
+# Кеш ответов, версий данных и пользователей. Общий для всех процессов
+# только с memcached (MEMCACHED_LOCATION, например 127.0.0.1:11211); без него
+# кеш свой у каждого процесса и ключи живут не дольше LOCAL_CACHE_TIMEOUT.
+MEMCACHED_LOCATION = os.getenv('MEMCACHED_LOCATION')
+SHARED_CACHE = bool(MEMCACHED_LOCATION)
+if SHARED_CACHE:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+            'LOCATION': MEMCACHED_LOCATION,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            # Два ключа на произведение: представление и его версия.
+            'OPTIONS': {'MAX_ENTRIES': 100000},
+        }
+    }
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -100,7 +144,7 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.AllowAny',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
@@ -108,9 +152,30 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS':
         'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
+    'DEFAULT_THROTTLE_RATES': {
+        'signup': '30/min',
+        'token': '30/min',
+        'write': '120/min',
+    },
+    # Число доверенных прокси перед приложением: адрес клиента для
+    # ограничений берётся из X-Forwarded-For только за ними. 0 - адрес
+    # соединения, заголовок клиента не учитывается.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', 0)),
+}
+
+# Хранилище корзин для ограничения частоты запросов. Для нескольких
+# процессов: {'BACKEND': 'api.throttling.RedisStore',
+# 'OPTIONS': {'url': 'redis://localhost:6379/0'}}.
+THROTTLE_STORE = {
+    'BACKEND': 'api.throttling.LocalMemoryStore',
 }
 
 
+# Общий кеш пользователей для аутентификации; None - только память процесса.
+# Кеш в памяти процесса вторым уровнем не нужен: сброс в одном процессе
+# не доходит до остальных.
+AUTH_USER_CACHE = 'default' if SHARED_CACHE else None
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=35),
     'AUTH_HEADER_TYPES': ('Bearer',),
@@ -119,3 +184,19 @@ SIMPLE_JWT = {
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 DEFAULT_FROM_EMAIL = 'black.yamdb@example.com'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'api.metrics': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
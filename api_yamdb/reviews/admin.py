@@ -1,5 +1,4 @@
 from django.contrib import admin
-from django.db.models import Avg
 
 from reviews.models import Category, Comment, Genre, Review, Title, GenreTitle
 
@@ -66,13 +65,11 @@ class TitleAdmin(admin.ModelAdmin):
 
     @admin.display(description='Отзывов')
     def view_reviews(self, obj):
-        return obj.reviews.all().count()
+        return obj.score_count
 
     @admin.display(description='Рейтинг')
     def view_rating(self, obj):
-        rating = obj.reviews.aggregate(
-            Avg('score', default=None))['score__avg']
-        return round(rating) if rating is not None else rating
+        return obj.rating
 
 
 @admin.register(Review)
@@ -87,8 +84,7 @@ class ReviewAdmin(admin.ModelAdmin):
 
     @admin.display(description='Комментариев')
     def comments_count(self, obj):
-        comments = obj.comments.all().count()
-        return comments
+        return obj.comments_count
 
 
 @admin.register(Comment)
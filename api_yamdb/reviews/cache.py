@@ -0,0 +1,82 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from api_yamdb.constants import LOCAL_CACHE_TIMEOUT
+
+VERSION_KEY = 'version:{}'
+
+# Имена версий наборов данных.
+TITLES_VERSION = 'titles'
+TITLE_VERSION = 'title:{}'
+REVIEWS_VERSION = 'reviews:{}'
+COMMENTS_VERSION = 'comments:{}'
+USERS_VERSION = 'user'
+
+
+def get_timeout(timeout):
+    """
+    Время жизни ключа с учётом вида кеша.
+
+    Кеш процесса не узнаёт о сменах версий в других процессах, поэтому
+    его ключи, включая сами версии, живут не дольше LOCAL_CACHE_TIMEOUT.
+    """
+    if getattr(settings, 'SHARED_CACHE', False):
+        return timeout
+    if timeout is None:
+        return LOCAL_CACHE_TIMEOUT
+    return min(timeout, LOCAL_CACHE_TIMEOUT)
+
+
+def get_versions(*names):
+    """
+    Текущие версии именованных наборов данных.
+
+    Отсутствующая в кеше версия начинается с текущего времени в наносекундах,
+    поэтому после вытеснения из кеша старые значения не повторяются.
+    """
+    keys = [VERSION_KEY.format(name) for name in names]
+    versions = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=get_timeout(None))
+        versions.update(missing)
+    return tuple(versions[key] for key in keys)
+
+
+def bump_version(*names):
+    """Меняет версии наборов данных, делая устаревшими связанные кеши."""
+    for name in names:
+        key = VERSION_KEY.format(name)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=get_timeout(None))
+
+
+def bump_version_on_commit(*names):
+    """Меняет версии после фиксации текущей транзакции."""
+    transaction.on_commit(lambda: bump_version(*names))
+
+
+def bump_title_versions(*title_ids):
+    """Сбрасывает версии произведений и их списка."""
+    bump_version_on_commit(
+        TITLES_VERSION,
+        *(TITLE_VERSION.format(title_id) for title_id in title_ids)
+    )
+
+
+def bump_review_versions(*title_ids):
+    """Сбрасывает версии отзывов и рейтинга произведений."""
+    bump_version_on_commit(
+        *(REVIEWS_VERSION.format(title_id) for title_id in title_ids))
+    bump_title_versions(*title_ids)
+
+
+def bump_shared_versions_on_commit():
+    """Сбрасывает все кеши API после массовой записи в обход сигналов."""
+    bump_version_on_commit(
+        TITLES_VERSION, 'category', 'genre', USERS_VERSION)
@@ -1,53 +1,173 @@
 import csv
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
 
 from django.conf import settings
-from django.core.management.base import BaseCommand
-from django.db import transaction
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
 
-from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
-from users.models import ProjectUser
+from reviews.cache import bump_shared_versions_on_commit
+from reviews.management.csv_import import (get_file_model, get_parent_models,
+                                           import_chunk, import_file,
+                                           init_worker, insert_rows,
+                                           load_known_ids)
+from reviews.management.utils import batched
 
 from api_yamdb.constants import (
-    DATA_FILES_CSV, STATIC_PATH, CATEGORY, GENRE,
-    TITLES, GENRE_TITLE, USERS, COMMENTS, REVIEW)
+    CHUNKED_FILES_CSV, DATA_FILES_CSV, IMPORT_BATCH_SIZE, IMPORT_CHUNK_SIZE,
+    IMPORT_STAGES_CSV, STATIC_PATH)
 
 
 class Command(BaseCommand):
     """Скрипт для загрузки данных."""
 
-    help = ('Импортирует данные из CSV-файлов в модели,'
-            f'из каталога: {settings.BASE_DIR}{STATIC_PATH}')
+    help = ('Импортирует данные из CSV-файлов в модели пачками, '
+            'по умолчанию из каталога: '
+            f'{settings.BASE_DIR}{STATIC_PATH}. С --workers независимые '
+            'файлы и части больших файлов загружаются параллельно, каждая '
+            'часть в своей транзакции.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'data_dir', nargs='?',
+            default=f'{settings.BASE_DIR}{STATIC_PATH}',
+            help='Каталог с CSV-файлами.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=IMPORT_BATCH_SIZE,
+            help='Количество строк в одном INSERT.'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=0,
+            help='Число процессов для параллельной загрузки.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=IMPORT_CHUNK_SIZE,
+            help='Строк в одной части большого файла.'
+        )
 
-    @transaction.atomic
     def handle(self, *args, **options):
-        cnt = 0
+        data_dir = Path(options['data_dir'])
+        missing = [
+            name for name in DATA_FILES_CSV if not (data_dir / name).is_file()
+        ]
+        if missing:
+            raise CommandError(
+                f'В каталоге {data_dir} нет файлов: {", ".join(missing)}')
+        self.batch_size = options['batch_size']
+        self.summary = defaultdict(lambda: {'rows': 0, 'skipped': 0})
+        # Конфликтующие строки bulk_create пропускает молча, поэтому
+        # вставленные строки считаются по числу записей до и после загрузки.
+        counts_before = self.count_rows()
+        started = time.monotonic()
+        if options['workers'] > 0:
+            self.load_parallel(
+                data_dir, options['workers'], options['chunk_size'])
+        else:
+            with transaction.atomic():
+                self.load_sequential(data_dir)
+        with transaction.atomic():
+            # Массовая вставка идёт в обход сигналов.
+            call_command('recalculate_ratings', stdout=self.stdout)
+            call_command('rebuild_search_index', stdout=self.stdout)
+            bump_shared_versions_on_commit()
+        self.report(started, counts_before, self.count_rows())
+
+    @staticmethod
+    def count_rows():
+        return {
+            file_name: get_file_model(file_name).objects.count()
+            for file_name in DATA_FILES_CSV
+        }
+
+    def load_sequential(self, data_dir):
+        known_ids = {}
         for file_name in DATA_FILES_CSV:
-            file_path = f'{settings.BASE_DIR}{STATIC_PATH}{file_name}'
-            with open(file_path, 'r', encoding='utf-8') as file:
-                reader = csv.DictReader(file, delimiter=",")
-                for row in reader:
-                    if file_name == CATEGORY:
-                        Category.objects.update_or_create(**row)
-                    elif file_name == GENRE:
-                        Genre.objects.update_or_create(**row)
-                    elif file_name == TITLES:
-                        # Заменяем в словаре row ключ на соответств. модели.
-                        row['category_id'] = row.pop('category')
-                        Title.objects.update_or_create(**row)
-                    elif file_name == GENRE_TITLE:
-                        GenreTitle.objects.update_or_create(**row)
-                    elif file_name == USERS:
-                        ProjectUser.objects.update_or_create(**row)
-                    elif file_name == REVIEW:
-                        row['author_id'] = row.pop('author')
-                        Review.objects.update_or_create(**row)
-                    elif file_name == COMMENTS:
-                        row['review_id_id'] = row.pop('review_id')
-                        row['author_id'] = row.pop('author')
-                        Comment.objects.update_or_create(**row)
-                cnt += 1
-                self.stdout.write(
-                    self.style.SUCCESS(f'Файл {file_name} загружен')
+            known_ids.update(load_known_ids(
+                get_parent_models((file_name,)) - known_ids.keys()))
+            file_started = time.monotonic()
+            with open(data_dir / file_name, 'r', encoding='utf-8') as file:
+                cnt, skipped = insert_rows(
+                    file_name, csv.DictReader(file, delimiter=','),
+                    known_ids, self.batch_size,
+                    progress=lambda cnt: self.stdout.write(
+                        f'{file_name}: обработано {cnt} строк, '
+                        f'{self.speed(cnt, file_started):.0f} строк/с'
+                    )
                 )
-        self.stdout.write(
-            self.style.SUCCESS(f'Загрузка завершена. Файлов загружено: {cnt}'))
+            # ignore_conflicts пропускает и нарушения уникальности,
+            # поэтому id загруженной модели перечитываются.
+            known_ids.pop(get_file_model(file_name)._meta.label, None)
+            self.add_result(file_name, cnt, skipped)
+
+    def load_parallel(self, data_dir, workers, chunk_size):
+        for stage in IMPORT_STAGES_CSV:
+            known_ids = load_known_ids(get_parent_models(stage))
+            # Соединения не должны наследоваться процессами-обработчиками.
+            connections.close_all()
+            with ProcessPoolExecutor(
+                    max_workers=workers, initializer=init_worker,
+                    initargs=(known_ids,)) as executor:
+                pending = set()
+                for file_name in stage:
+                    if file_name not in CHUNKED_FILES_CSV:
+                        pending.add(executor.submit(
+                            import_file, data_dir / file_name,
+                            self.batch_size))
+                        continue
+                    with open(data_dir / file_name, 'r',
+                              encoding='utf-8') as file:
+                        reader = csv.DictReader(file, delimiter=',')
+                        for rows in batched(reader, chunk_size):
+                            # Ограничиваем число частей в памяти.
+                            if len(pending) >= workers * 2:
+                                pending = self.collect(pending)
+                            pending.add(executor.submit(
+                                import_chunk, file_name, rows,
+                                self.batch_size))
+                while pending:
+                    pending = self.collect(pending)
+
+    def collect(self, pending):
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            file_name, cnt, skipped = future.result()
+            self.add_result(file_name, cnt, skipped)
+            self.stdout.write(
+                f'{file_name}: обработано {self.summary[file_name]["rows"]} '
+                'строк')
+        return pending
+
+    def add_result(self, file_name, cnt, skipped):
+        self.summary[file_name]['rows'] += cnt
+        self.summary[file_name]['skipped'] += skipped
+
+    def report(self, started, counts_before, counts_after):
+        total = 0
+        processed = 0
+        for file_name in DATA_FILES_CSV:
+            result = self.summary[file_name]
+            inserted = counts_after[file_name] - counts_before[file_name]
+            total += inserted
+            processed += result['rows']
+            if result['skipped']:
+                self.stdout.write(self.style.WARNING(
+                    f'{file_name}: пропущено строк без связанных '
+                    f'объектов: {result["skipped"]}'
+                ))
+            self.stdout.write(self.style.SUCCESS(
+                f'Файл {file_name} загружен: добавлено {inserted} строк, '
+                f'уже были загружены {result["rows"] - inserted}'))
+        self.stdout.write(self.style.SUCCESS(
+            f'Загрузка завершена. Файлов загружено: {len(DATA_FILES_CSV)}, '
+            f'добавлено строк: {total}, '
+            f'{self.speed(processed, started):.0f} строк/с'
+        ))
+
+    @staticmethod
+    def speed(cnt, started):
+        elapsed = time.monotonic() - started
+        return cnt / elapsed if elapsed else cnt
@@ -0,0 +1,35 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from reviews.models import ChangeLog
+
+from api_yamdb.constants import CHANGES_RETENTION_DAYS
+
+
+class Command(BaseCommand):
+    """Скрипт для удаления старых записей журнала изменений."""
+
+    help = ('Удаляет записи журнала изменений старше --days дней. '
+            'Клиентам, не синхронизировавшимся дольше, нужно загрузить '
+            'списки заново.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=CHANGES_RETENTION_DAYS,
+            help='Сколько дней хранить записи.'
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        # Граница ищется по порядковому номеру: записи удаляются с начала
+        # журнала, не оставляя пропусков среди хранимых.
+        first_kept = ChangeLog.objects.filter(
+            created_at__gte=cutoff).values_list('id', flat=True).first()
+        changes = ChangeLog.objects.all()
+        if first_kept is not None:
+            changes = changes.filter(id__lt=first_kept)
+        cnt, _ = changes.delete()
+        self.stdout.write(
+            self.style.SUCCESS(f'Удалено записей журнала: {cnt}'))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.cache import TITLES_VERSION, bump_version_on_commit
+from reviews.search import rebuild_index
+
+
+class Command(BaseCommand):
+    """Скрипт для перестроения поискового индекса произведений."""
+
+    help = 'Перестраивает полнотекстовый индекс названий и описаний.'
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        cnt = rebuild_index()
+        # Результаты поиска кешируются вместе со списком произведений.
+        bump_version_on_commit(TITLES_VERSION)
+        self.stdout.write(self.style.SUCCESS(
+            f'Поисковый индекс перестроен. Произведений: {cnt}'))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.cache import bump_shared_versions_on_commit
+from reviews.models import Review, Title, TitleScore
+
+
+class Command(BaseCommand):
+    """Скрипт для пересчёта рейтингов произведений."""
+
+    help = ('Пересчитывает сумму, количество оценок, рейтинг и '
+            'распределение оценок всех произведений по отзывам и '
+            'количество комментариев отзывов.')
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        cnt = Title.objects.all().recalculate_scores()
+        TitleScore.objects.rebuild()
+        Review.objects.all().recalculate_comments_count()
+        # Запросы UPDATE идут в обход сигналов: версии кешей и ETag
+        # сбрасываются явно.
+        bump_shared_versions_on_commit()
+        self.stdout.write(
+            self.style.SUCCESS(f'Рейтинги пересчитаны. Произведений: {cnt}'))
@@ -0,0 +1,146 @@
+import random
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+
+from reviews.management.utils import batched
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from users.models import ProjectUser
+
+from api_yamdb.constants import MAX_SCORE, MIN_SCORE
+
+BENCH_PREFIX = 'bench'
+WORDS = (
+    'побег', 'отец', 'война', 'мир', 'ночь', 'город', 'море', 'звезда',
+    'дорога', 'тайна', 'время', 'дом', 'песня', 'сердце', 'остров',
+)
+
+
+class Command(BaseCommand):
+    """Скрипт для наполнения базы данными для замеров производительности."""
+
+    help = ('Создаёт заданное количество пользователей, произведений, '
+            'отзывов и комментариев для нагрузочных замеров API.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1_000)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--genres', type=int, default=30)
+        parser.add_argument('--titles', type=int, default=1_000)
+        parser.add_argument('--reviews', type=int, default=10_000)
+        parser.add_argument('--comments', type=int, default=20_000)
+        parser.add_argument('--batch-size', type=int, default=5_000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        if options['titles'] < 1 or options['users'] < 1:
+            raise CommandError('Нужно хотя бы одно произведение и автор.')
+        # Каждый автор пишет не больше одного отзыва на произведение.
+        authors_needed = -(-options['reviews'] // options['titles'])
+        if authors_needed > options['users']:
+            raise CommandError(
+                f'Для {options["reviews"]} отзывов на {options["titles"]} '
+                f'произведений нужно не меньше {authors_needed} '
+                'пользователей.'
+            )
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+
+        users = self.insert(ProjectUser, self.users, options['users'])
+        categories = self.insert(
+            Category, self.categories, options['categories'])
+        genres = self.insert(Genre, self.genres, options['genres'])
+        titles = self.insert(
+            Title, self.titles, options['titles'], categories)
+        self.insert(GenreTitle, self.genre_titles, titles, genres)
+        reviews = self.insert(
+            Review, self.reviews, options['reviews'], titles, users)
+        if reviews:
+            self.insert(
+                Comment, self.comments, options['comments'], reviews, users)
+
+        call_command('recalculate_ratings', stdout=self.stdout)
+        call_command('rebuild_search_index', stdout=self.stdout)
+
+    def insert(self, model, factory, *args):
+        """Вставляет объекты пачками, возвращает диапазон новых id."""
+        start = (model.objects.aggregate(max_id=Max('id'))['max_id'] or 0) + 1
+        started = time.monotonic()
+        cnt = 0
+        for batch in batched(factory(start, *args), self.batch_size):
+            with transaction.atomic():
+                model.objects.bulk_create(batch, batch_size=self.batch_size)
+            cnt += len(batch)
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'{model._meta.verbose_name_plural}: {cnt} '
+            f'({cnt / elapsed if elapsed else cnt:.0f} в секунду)'
+        ))
+        return range(start, start + cnt)
+
+    def text(self, words):
+        return ' '.join(self.random.choices(WORDS, k=words))
+
+    def users(self, start, count):
+        for pk in range(start, start + count):
+            yield ProjectUser(
+                id=pk,
+                username=f'{BENCH_PREFIX}_user_{pk}',
+                email=f'{BENCH_PREFIX}_user_{pk}@yamdb.fake',
+                password='!',
+            )
+
+    def categories(self, start, count):
+        for pk in range(start, start + count):
+            yield Category(
+                id=pk, name=f'Категория {pk}',
+                slug=f'{BENCH_PREFIX}-category-{pk}')
+
+    def genres(self, start, count):
+        for pk in range(start, start + count):
+            yield Genre(
+                id=pk, name=f'Жанр {pk}', slug=f'{BENCH_PREFIX}-genre-{pk}')
+
+    def titles(self, start, count, categories):
+        for pk in range(start, start + count):
+            yield Title(
+                id=pk,
+                name=self.text(3).capitalize(),
+                year=self.random.randint(1900, 2020),
+                description=self.text(20),
+                category_id=(
+                    self.random.choice(categories) if categories else None),
+            )
+
+    def genre_titles(self, start, titles, genres):
+        if not genres:
+            return
+        pk = start
+        for title_id in titles:
+            for genre_id in self.random.sample(
+                    genres, min(len(genres), self.random.randint(1, 3))):
+                yield GenreTitle(id=pk, title_id=title_id, genre_id=genre_id)
+                pk += 1
+
+    def reviews(self, start, count, titles, users):
+        for number in range(count):
+            # Пара (произведение, автор) не повторяется.
+            yield Review(
+                id=start + number,
+                title_id=titles[number % len(titles)],
+                author_id=users[number // len(titles)],
+                text=self.text(30),
+                score=self.random.randint(MIN_SCORE, MAX_SCORE),
+            )
+
+    def comments(self, start, count, reviews, users):
+        for pk in range(start, start + count):
+            yield Comment(
+                id=pk,
+                review_id_id=self.random.choice(reviews),
+                author_id=self.random.choice(users),
+                text=self.text(15),
+            )
@@ -0,0 +1,127 @@
+"""
+Загрузка строк CSV в модели, общая для команды и процессов-обработчиков.
+
+Модуль не импортирует модели: процесс, запущенный методом spawn,
+импортирует его до django.setup(), поэтому модели задаются метками и
+получаются из реестра приложений уже после настройки.
+"""
+import csv
+from pathlib import Path
+
+import django
+from django.apps import apps
+from django.db import connections, transaction
+
+from api_yamdb.constants import (CATEGORY, COMMENTS, GENRE, GENRE_TITLE,
+                                 REVIEW, TITLES, USERS)
+from reviews.management.utils import batched
+
+# Модель и внешние ключи для каждого файла:
+# колонка CSV -> (поле модели, модель, допускается ли пустое значение).
+IMPORT_SCHEMA = {
+    CATEGORY: ('reviews.Category', {}),
+    GENRE: ('reviews.Genre', {}),
+    USERS: ('users.ProjectUser', {}),
+    TITLES: ('reviews.Title', {
+        'category': ('category_id', 'reviews.Category', True),
+    }),
+    GENRE_TITLE: ('reviews.GenreTitle', {
+        'title_id': ('title_id', 'reviews.Title', False),
+        'genre_id': ('genre_id', 'reviews.Genre', False),
+    }),
+    REVIEW: ('reviews.Review', {
+        'title_id': ('title_id', 'reviews.Title', False),
+        'author': ('author_id', 'users.ProjectUser', False),
+    }),
+    COMMENTS: ('reviews.Comment', {
+        'review_id': ('review_id_id', 'reviews.Review', False),
+        'author': ('author_id', 'users.ProjectUser', False),
+    }),
+}
+PROGRESS_EVERY = 10
+
+# id родительских моделей в процессе-обработчике параллельной загрузки.
+worker_known_ids = {}
+
+
+def get_file_model(file_name):
+    return apps.get_model(IMPORT_SCHEMA[file_name][0])
+
+
+def get_parent_models(file_names):
+    """Метки моделей, на которые ссылаются строки файлов."""
+    return {
+        parent
+        for file_name in file_names
+        for _, parent, _ in IMPORT_SCHEMA[file_name][1].values()
+    }
+
+
+def load_known_ids(labels):
+    return {
+        label: set(
+            apps.get_model(label).objects.values_list('id', flat=True))
+        for label in labels
+    }
+
+
+def build_objects(rows, file_name, known_ids, skipped):
+    """Объекты модели из строк CSV; строки с битыми ссылками пропускаются."""
+    label, foreign_keys = IMPORT_SCHEMA[file_name]
+    model = apps.get_model(label)
+    for row in rows:
+        for column, (field, parent, nullable) in foreign_keys.items():
+            value = row.pop(column) or None
+            if value is None and nullable:
+                row[field] = None
+                continue
+            if value is None or int(value) not in known_ids[parent]:
+                skipped.append(row.get('id'))
+                break
+            row[field] = value
+        else:
+            yield model(**row)
+
+
+def insert_rows(file_name, rows, known_ids, batch_size, progress=None):
+    """Вставляет строки пачками, возвращает обработанные и пропущенные."""
+    model = get_file_model(file_name)
+    skipped = []
+    cnt = 0
+    objects = build_objects(rows, file_name, known_ids, skipped)
+    for number, batch in enumerate(batched(objects, batch_size), 1):
+        # Уже загруженные строки пропускаются при повторном запуске.
+        model.objects.bulk_create(
+            batch, batch_size=batch_size, ignore_conflicts=True)
+        cnt += len(batch)
+        if progress is not None and number % PROGRESS_EVERY == 0:
+            progress(cnt)
+    return cnt, len(skipped)
+
+
+def init_worker(known_ids):
+    """Подготовка процесса-обработчика параллельной загрузки."""
+    # При spawn процесс начинается с чистого интерпретатора.
+    django.setup()
+    # Соединения родительского процесса не используются повторно.
+    connections.close_all()
+    worker_known_ids.clear()
+    worker_known_ids.update(known_ids)
+
+
+def import_chunk(file_name, rows, batch_size):
+    """Загружает часть строк файла в процессе-обработчике."""
+    with transaction.atomic():
+        cnt, skipped = insert_rows(
+            file_name, rows, worker_known_ids, batch_size)
+    return file_name, cnt, skipped
+
+
+def import_file(file_path, batch_size):
+    """Загружает файл целиком в процессе-обработчике."""
+    with open(file_path, 'r', encoding='utf-8') as file:
+        with transaction.atomic():
+            cnt, skipped = insert_rows(
+                Path(file_path).name, csv.DictReader(file, delimiter=','),
+                worker_known_ids, batch_size)
+    return Path(file_path).name, cnt, skipped
@@ -1,6 +1,8 @@
 from django.contrib.auth import get_user_model
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Case, Count, F, OuterRef, Subquery, Sum, When
+from django.db.models.functions import Coalesce
 from django.utils.text import Truncator
 
 from api_yamdb.constants import (LENG_MAX, MAX_SCORE, MIN_SCORE, NUMBER_WORDS)
@@ -44,6 +46,47 @@ class Category(BaseModelCategoryGenre):
         verbose_name_plural = 'Категории'
 
 
+class TitleQuerySet(models.QuerySet):
+    """Запросы к произведениям с поддержкой агрегатов оценок."""
+
+    def change_scores(self, score_delta, count_delta):
+        """Сдвигает сумму и количество оценок и пересчитывает рейтинг."""
+        new_sum = F('score_sum') + score_delta
+        new_count = F('score_count') + count_delta
+        return self.update(
+            score_sum=new_sum,
+            score_count=new_count,
+            # В UPDATE справа используются старые значения полей.
+            rating=Case(
+                When(score_count=-count_delta, then=None),
+                default=new_sum / new_count,
+                output_field=models.IntegerField(),
+            ),
+        )
+
+    def recalculate_scores(self):
+        """Пересчитывает агрегаты оценок по отзывам."""
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')).order_by().values('title')
+        self.update(
+            score_sum=Coalesce(
+                Subquery(reviews.annotate(total=Sum('score')).values('total')),
+                0,
+                output_field=models.IntegerField(),
+            ),
+            score_count=Coalesce(
+                Subquery(reviews.annotate(total=Count('id')).values('total')),
+                0,
+                output_field=models.IntegerField(),
+            ),
+        )
+        return self.update(rating=Case(
+            When(score_count=0, then=None),
+            default=F('score_sum') / F('score_count'),
+            output_field=models.IntegerField(),
+        ))
+
+
 class Title(models.Model):
     """Произведения."""
 
@@ -63,18 +106,38 @@ class Title(models.Model):
         blank=True,
         on_delete=models.SET_NULL,
         verbose_name='Название категории',
+        db_index=False,
     )
     genre = models.ManyToManyField(
         Genre,
         through='GenreTitle',
         verbose_name='Жанры'
     )
+    score_sum = models.PositiveIntegerField(
+        'Сумма оценок', default=0, editable=False)
+    score_count = models.PositiveIntegerField(
+        'Количество оценок', default=0, editable=False)
+    rating = models.PositiveSmallIntegerField(
+        'Рейтинг', null=True, blank=True, editable=False)
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         default_related_name = 'titles'
         verbose_name = 'произведение'
         verbose_name_plural = 'Произведения'
         ordering = ('year', 'name',)
+        indexes = [
+            models.Index(
+                fields=['category', 'year'], name='title_category_year_idx'),
+            # Рейтинги и сортировка по оценкам читаются из индексов.
+            models.Index(
+                fields=['-rating', '-score_count', 'id'],
+                name='title_rating_idx'),
+            models.Index(
+                fields=['-score_count', '-rating', 'id'],
+                name='title_reviews_count_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -83,15 +146,26 @@ class Title(models.Model):
 class GenreTitle(models.Model):
     """Связь произведений и жанров."""
 
+    # Индексы внешних ключей заменены составными из Meta.
     title = models.ForeignKey(
-        Title, null=True, blank=True, on_delete=models.SET_NULL)
+        Title, null=True, blank=True, on_delete=models.SET_NULL,
+        db_index=False)
     genre = models.ForeignKey(
-        Genre, null=True, blank=True, on_delete=models.SET_NULL)
+        Genre, null=True, blank=True, on_delete=models.SET_NULL,
+        db_index=False)
 
     class Meta:
         verbose_name = 'произведение - жанр'
         verbose_name_plural = 'Произведения - жанры'
         default_related_name = 'title_genres'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['title', 'genre'], name='unique_title_genre'),
+        ]
+        indexes = [
+            models.Index(
+                fields=['genre', 'title'], name='genretitle_genre_title_idx'),
+        ]
 
     def __str__(self):
         return f'{self.title.name} - {self.genre.name}'
@@ -118,13 +192,31 @@ class BaseModelReviewComment(models.Model):
         return Truncator(self.text).words(NUMBER_WORDS)
 
 
+class ReviewQuerySet(models.QuerySet):
+    """Запросы к отзывам со счётчиком комментариев."""
+
+    def change_comments_count(self, delta):
+        return self.update(comments_count=F('comments_count') + delta)
+
+    def recalculate_comments_count(self):
+        """Пересчитывает счётчики комментариев по комментариям."""
+        comments = Comment.objects.filter(
+            review_id=OuterRef('pk')).order_by().values('review_id')
+        return self.update(comments_count=Coalesce(
+            Subquery(comments.annotate(total=Count('id')).values('total')),
+            0,
+            output_field=models.IntegerField(),
+        ))
+
+
 class Review(BaseModelReviewComment):
     """Модель отзыва к произведению."""
 
     title = models.ForeignKey(
         Title,
         on_delete=models.CASCADE,
-        verbose_name='Произведение'
+        verbose_name='Произведение',
+        db_index=False,
     )
     score = models.PositiveSmallIntegerField(
         verbose_name='Оценка',
@@ -136,6 +228,10 @@ class Review(BaseModelReviewComment):
             MaxValueValidator(MAX_SCORE)
         ]
     )
+    comments_count = models.PositiveIntegerField(
+        'Количество комментариев', default=0, editable=False)
+
+    objects = ReviewQuerySet.as_manager()
 
     class Meta(BaseModelReviewComment.Meta):
         verbose_name = 'отзыв'
@@ -147,6 +243,17 @@ class Review(BaseModelReviewComment):
                 name='one_review_per_author'
             )
         ]
+        # Отзывы читаются по произведению от новых к старым.
+        indexes = [
+            models.Index(
+                fields=['title', '-pub_date', 'id'],
+                name='review_title_pub_date_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Агрегаты оценок произведения меняются в той же транзакции.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
 
 class Comment(BaseModelReviewComment):
@@ -156,10 +263,145 @@ class Comment(BaseModelReviewComment):
         Review,
         on_delete=models.CASCADE,
         related_name='comments',
-        verbose_name='Отзыв'
+        verbose_name='Отзыв',
+        db_index=False,
     )
 
     class Meta(BaseModelReviewComment.Meta):
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
         default_related_name = 'comments'
+        # Комментарии читаются по отзыву от новых к старым.
+        indexes = [
+            models.Index(
+                fields=['review_id', '-pub_date', 'id'],
+                name='comment_review_pub_date_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Счётчик отзыва и журнал изменений пишутся в той же транзакции.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+class TitleScoreQuerySet(models.QuerySet):
+    """Счётчики оценок произведений."""
+
+    def change_count(self, title_id, score, delta):
+        """Сдвигает счётчик оценки, создавая его при первом отзыве."""
+        updated = self.filter(title_id=title_id, score=score).update(
+            count=F('count') + delta)
+        if updated or delta < 0:
+            return
+        try:
+            with transaction.atomic():
+                self.create(title_id=title_id, score=score, count=delta)
+        except IntegrityError:
+            # Счётчик создан параллельным запросом.
+            self.filter(title_id=title_id, score=score).update(
+                count=F('count') + delta)
+
+    def add_counts(self, counts):
+        """Увеличивает счётчики на {(title_id, score): n} одним пакетом."""
+        # Недостающие счётчики создаются заранее, параллельно созданные
+        # пропускаются, поэтому дальше достаточно сдвигать существующие.
+        self.bulk_create(
+            [
+                self.model(title_id=title_id, score=score, count=0)
+                for title_id, score in counts
+            ],
+            ignore_conflicts=True,
+        )
+        for (title_id, score), delta in counts.items():
+            self.filter(title_id=title_id, score=score).update(
+                count=F('count') + delta)
+
+    def rebuild(self, title_ids=None):
+        """Пересобирает счётчики по отзывам: все или только title_ids."""
+        counters = self.all()
+        reviews = Review.objects.order_by()
+        if title_ids is not None:
+            counters = counters.filter(title_id__in=title_ids)
+            reviews = reviews.filter(title_id__in=title_ids)
+        counters.delete()
+        rows = reviews.values('title_id', 'score').annotate(count=Count('id'))
+        return len(self.bulk_create(
+            self.model(**row) for row in rows.iterator()))
+
+
+class TitleScore(models.Model):
+    """Количество отзывов с каждой оценкой произведения."""
+
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='score_counters',
+        verbose_name='Произведение',
+        db_index=False,
+    )
+    score = models.PositiveSmallIntegerField('Оценка')
+    count = models.PositiveIntegerField('Количество отзывов', default=0)
+
+    objects = TitleScoreQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'счётчик оценки'
+        verbose_name_plural = 'Счётчики оценок'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['title', 'score'], name='unique_title_score'),
+        ]
+
+    def __str__(self):
+        return f'{self.title_id}: {self.score} - {self.count}'
+
+
+class ChangeLog(models.Model):
+    """
+    Журнал изменений отзывов и комментариев.
+
+    Записи добавляются в транзакции изменения объекта, id записи служит
+    порядковым номером для получения изменений с последней синхронизации.
+    Пишут их сигналы и пакетная загрузка отзывов; команды load_data_csv и
+    seed_benchmark_data вставляют строки в обход сигналов, а
+    recalculate_ratings обновляет счётчики комментариев запросом, поэтому
+    в журнал они не попадают. Старые записи удаляет команда prune_changelog.
+    """
+
+    REVIEW = 'review'
+    COMMENT = 'comment'
+    CONTENT_TYPES = (
+        (REVIEW, 'Отзыв'),
+        (COMMENT, 'Комментарий'),
+    )
+    CREATED = 'created'
+    UPDATED = 'updated'
+    DELETED = 'deleted'
+    ACTIONS = (
+        (CREATED, 'Создан'),
+        (UPDATED, 'Изменён'),
+        (DELETED, 'Удалён'),
+    )
+
+    id = models.BigAutoField(primary_key=True)
+    content_type = models.CharField(
+        'Тип объекта', max_length=16, choices=CONTENT_TYPES)
+    object_id = models.PositiveIntegerField('id объекта')
+    action = models.CharField('Действие', max_length=16, choices=ACTIONS)
+    # Не внешние ключи: записи об удалении переживают объекты.
+    title_id = models.PositiveIntegerField('id произведения')
+    review_id = models.PositiveIntegerField(
+        'id отзыва', null=True, blank=True)
+    created_at = models.DateTimeField('Дата изменения', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'изменение'
+        verbose_name_plural = 'Журнал изменений'
+        ordering = ('id',)
+        indexes = [
+            models.Index(
+                fields=['title_id', 'id'], name='changelog_title_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.id}: {self.content_type} {self.object_id} {self.action}'
@@ -0,0 +1,163 @@
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Value
+from django.db.models.expressions import RawSQL
+
+# SQLite: виртуальная таблица FTS5, синхронизируется сигналами.
+# PostgreSQL: GIN-индекс по выражению to_tsvector, синхронизация не нужна.
+SEARCH_TABLE = 'reviews_title_fts'
+SEARCH_INDEX = 'reviews_title_search_idx'
+# Вес совпадения в названии относительно описания.
+NAME_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+MIN_STEM_LENGTH = 3
+
+# Окончания русских слов, от длинных к коротким.
+RUSSIAN_ENDINGS = sorted((
+    'иями', 'ями', 'ами', 'ыми', 'ими', 'ого', 'его', 'ому', 'ему',
+    'ешь', 'ете', 'ите', 'ать', 'ять', 'ить', 'еть', 'ыть',
+    'ах', 'ях', 'ов', 'ев', 'ей', 'ам', 'ям', 'ом', 'ем', 'ой', 'ою', 'ею',
+    'ия', 'ие', 'ий', 'ию', 'ая', 'яя', 'ое', 'ее', 'ые', 'ый', 'ую',
+    'юю', 'ых', 'их', 'ым', 'им', 'ет', 'ит', 'ут', 'ют', 'ат', 'ят',
+    'а', 'я', 'о', 'е', 'ы', 'и', 'у', 'ю', 'ь', 'й',
+), key=len, reverse=True)
+CYRILLIC_WORD = re.compile(r'^[а-яё]+$')
+WORD = re.compile(r'\w+')
+
+
+def postgres_document(table=None):
+    """Выражение tsvector для названия и описания произведения."""
+    prefix = f'"{table}".' if table else ''
+    return (
+        "to_tsvector('russian'::regconfig, "
+        f"COALESCE({prefix}\"name\", '') || ' ' || "
+        f"COALESCE({prefix}\"description\", ''))"
+    )
+
+
+def stem(word):
+    """Отсекает окончание русского слова, оставляя основу."""
+    if not CYRILLIC_WORD.match(word):
+        return word
+    for ending in RUSSIAN_ENDINGS:
+        if (word.endswith(ending)
+                and len(word) - len(ending) >= MIN_STEM_LENGTH):
+            return word[:-len(ending)]
+    return word
+
+
+def build_fts_query(text):
+    """Строка запроса FTS5: префиксный поиск по основам всех слов."""
+    words = WORD.findall(text.lower())
+    return ' '.join(f'"{stem(word)}"*' for word in words)
+
+
+def is_sqlite():
+    """Поиск через таблицу FTS5."""
+    return connection.vendor == 'sqlite'
+
+
+def is_postgresql():
+    """Поиск через tsvector и GIN-индекс."""
+    return connection.vendor == 'postgresql'
+
+
+def create_search_index(schema_editor):
+    """Создаёт поисковый индекс для текущей СУБД."""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} '
+            "USING fts5(name, description, "
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {SEARCH_INDEX} ON reviews_title '
+            f'USING GIN ({postgres_document()})'
+        )
+
+
+def drop_search_index(schema_editor):
+    """Удаляет поисковый индекс для текущей СУБД."""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+    elif vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {SEARCH_INDEX}')
+
+
+def index_title(title):
+    """Добавляет или обновляет произведение в поисковом индексе."""
+    if not is_sqlite():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', (title.pk,))
+        cursor.execute(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, name, description) '
+            'VALUES (%s, %s, %s)',
+            (title.pk, title.name, title.description or '')
+        )
+
+
+def remove_title(title_id):
+    """Удаляет произведение из поискового индекса."""
+    if not is_sqlite():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', (title_id,))
+
+
+def rebuild_index():
+    """Полностью перестраивает поисковый индекс, возвращает его размер."""
+    from reviews.models import Title
+
+    if not is_sqlite():
+        return Title.objects.count()
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, name, description) '
+            "SELECT id, name, COALESCE(description, '') FROM reviews_title"
+        )
+        return cursor.rowcount
+
+
+def search_titles(queryset, text):
+    """
+    Отбирает произведения, подходящие под поисковый запрос.
+
+    Релевантность сохраняется в аннотации `search_rank`:
+    чем больше значение, тем лучше совпадение.
+    """
+    table = queryset.model._meta.db_table
+    if is_postgresql():
+        query = "plainto_tsquery('russian'::regconfig, %s)"
+        document = postgres_document(table)
+        return queryset.filter(
+            RawSQL(f'{document} @@ {query}', (text,),
+                   output_field=BooleanField())
+        ).annotate(search_rank=RawSQL(
+            f'ts_rank({document}, {query})', (text,),
+            output_field=FloatField()
+        ))
+    query = build_fts_query(text)
+    if not query:
+        return queryset.annotate(
+            search_rank=Value(0.0, output_field=FloatField())).none()
+    return queryset.filter(
+        id__in=RawSQL(
+            f'SELECT rowid FROM {SEARCH_TABLE} '
+            f'WHERE {SEARCH_TABLE} MATCH %s',
+            (query,)
+        )
+    ).annotate(search_rank=RawSQL(
+        f'SELECT -bm25({SEARCH_TABLE}, {NAME_WEIGHT}, '
+        f'{DESCRIPTION_WEIGHT}) FROM {SEARCH_TABLE} '
+        f'WHERE {SEARCH_TABLE} MATCH %s AND rowid = "{table}"."id"',
+        (query,),
+        output_field=FloatField()
+    ))
@@ -0,0 +1,228 @@
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_save)
+from django.dispatch import receiver
+
+from reviews import search
+from reviews.cache import (COMMENTS_VERSION, REVIEWS_VERSION, USERS_VERSION,
+                           bump_review_versions, bump_title_versions,
+                           bump_version_on_commit)
+from reviews.models import (Category, ChangeLog, Comment, Genre, GenreTitle,
+                            Review, Title, TitleScore, User)
+
+
+@receiver(pre_save, sender=Review)
+def remember_review_score(sender, instance, **kwargs):
+    """Запоминает прежние произведение и оценку изменяемого отзыва."""
+    instance._previous_score = None
+    if instance._state.adding:
+        return
+    instance._previous_score = Review.objects.select_for_update().filter(
+        pk=instance.pk).values_list('title_id', 'score').first()
+
+
+@receiver(post_save, sender=Review)
+def update_title_scores_on_save(sender, instance, created, **kwargs):
+    """Обновляет агрегаты оценок произведения после сохранения отзыва."""
+    previous = getattr(instance, '_previous_score', None)
+    if previous is not None:
+        title_id, score = previous
+        if (title_id, score) == (instance.title_id, instance.score):
+            return
+        TitleScore.objects.change_count(title_id, score, -1)
+        if title_id == instance.title_id:
+            Title.objects.filter(pk=title_id).change_scores(
+                instance.score - score, 0)
+            TitleScore.objects.change_count(title_id, instance.score, 1)
+            return
+        Title.objects.filter(pk=title_id).change_scores(-score, -1)
+    Title.objects.filter(pk=instance.title_id).change_scores(
+        instance.score, 1)
+    TitleScore.objects.change_count(instance.title_id, instance.score, 1)
+
+
+@receiver(post_delete, sender=Review)
+def update_title_scores_on_delete(sender, instance, **kwargs):
+    """Обновляет агрегаты оценок произведения после удаления отзыва."""
+    Title.objects.filter(pk=instance.title_id).change_scores(
+        -instance.score, -1)
+    TitleScore.objects.change_count(instance.title_id, instance.score, -1)
+
+
+@receiver(post_save, sender=Title)
+def index_title(sender, instance, **kwargs):
+    """Обновляет произведение в поисковом индексе."""
+    search.index_title(instance)
+
+
+@receiver(post_delete, sender=Title)
+def remove_title_from_index(sender, instance, **kwargs):
+    """Удаляет произведение из поискового индекса."""
+    search.remove_title(instance.pk)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def bump_category_genre_version(sender, **kwargs):
+    """Сбрасывает кеш категорий и жанров после фиксации."""
+    bump_version_on_commit(sender._meta.model_name)
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+def bump_title_version(sender, instance, **kwargs):
+    """Сбрасывает версию изменённого произведения."""
+    bump_title_versions(instance.pk)
+
+
+@receiver(post_save, sender=GenreTitle)
+@receiver(post_delete, sender=GenreTitle)
+def bump_genre_title_version(sender, instance, **kwargs):
+    """Сбрасывает версию произведения при изменении его жанров."""
+    bump_title_versions(instance.title_id)
+
+
+@receiver(m2m_changed, sender=GenreTitle)
+def bump_title_genres_version(sender, instance, action, reverse, **kwargs):
+    """Сбрасывает версии произведений при изменении связей с жанрами."""
+    if not action.startswith('post_'):
+        return
+    if reverse:
+        # Жанр входит в версии всех произведений.
+        bump_version_on_commit(instance._meta.model_name)
+        return
+    bump_title_versions(instance.pk)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def bump_review_version(sender, instance, **kwargs):
+    """Сбрасывает версии отзывов и рейтинга произведения."""
+    title_ids = {instance.title_id}
+    previous = getattr(instance, '_previous_score', None)
+    if previous is not None:
+        title_ids.add(previous[0])
+    bump_review_versions(*title_ids)
+
+
+def bump_comments_versions(review_id, title_id=None):
+    """Сбрасывает версии комментариев отзыва и отзывов со счётчиком."""
+    if title_id is None:
+        title_id = Review.objects.filter(pk=review_id).values_list(
+            'title_id', flat=True).first()
+    bump_version_on_commit(COMMENTS_VERSION.format(review_id))
+    if title_id is not None:
+        bump_version_on_commit(REVIEWS_VERSION.format(title_id))
+
+
+@receiver(pre_save, sender=Comment)
+def remember_comment_review(sender, instance, **kwargs):
+    """Запоминает прежний отзыв изменяемого комментария."""
+    instance._previous_review_id = None
+    if instance._state.adding:
+        return
+    instance._previous_review_id = Comment.objects.filter(
+        pk=instance.pk).values_list('review_id', flat=True).first()
+
+
+@receiver(post_save, sender=Comment)
+def update_comments_count_on_save(sender, instance, created, **kwargs):
+    """Обновляет счётчики комментариев отзывов после сохранения."""
+    previous = getattr(instance, '_previous_review_id', None)
+    if previous == instance.review_id_id:
+        return
+    if previous is not None:
+        Review.objects.filter(pk=previous).change_comments_count(-1)
+        bump_comments_versions(previous)
+    Review.objects.filter(
+        pk=instance.review_id_id).change_comments_count(1)
+
+
+@receiver(post_delete, sender=Comment)
+def update_comments_count_on_delete(sender, instance, **kwargs):
+    """Обновляет счётчик комментариев отзыва после удаления."""
+    Review.objects.filter(
+        pk=instance.review_id_id).change_comments_count(-1)
+
+
+def get_comment_title_id(comment):
+    """Произведение комментария, запрашивается один раз."""
+    if not hasattr(comment, '_title_id'):
+        if Comment.review_id.is_cached(comment):
+            comment._title_id = comment.review_id.title_id
+        else:
+            comment._title_id = Review.objects.filter(
+                pk=comment.review_id_id).values_list(
+                    'title_id', flat=True).first()
+    return comment._title_id
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def bump_comment_version(sender, instance, **kwargs):
+    """Сбрасывает версии комментариев и отзывов со счётчиком."""
+    bump_comments_versions(
+        instance.review_id_id, get_comment_title_id(instance))
+
+
+@receiver(post_save, sender=Review)
+def log_review_save(sender, instance, created, **kwargs):
+    """Записывает создание или изменение отзыва в журнал."""
+    previous = getattr(instance, '_previous_score', None)
+    if previous is not None and previous[0] != instance.title_id:
+        # Для синхронизации прежнего произведения отзыв удалён.
+        ChangeLog.objects.create(
+            content_type=ChangeLog.REVIEW, object_id=instance.pk,
+            action=ChangeLog.DELETED, title_id=previous[0])
+    ChangeLog.objects.create(
+        content_type=ChangeLog.REVIEW, object_id=instance.pk,
+        action=ChangeLog.CREATED if created else ChangeLog.UPDATED,
+        title_id=instance.title_id)
+
+
+@receiver(post_delete, sender=Review)
+def log_review_delete(sender, instance, **kwargs):
+    """Записывает удаление отзыва в журнал."""
+    ChangeLog.objects.create(
+        content_type=ChangeLog.REVIEW, object_id=instance.pk,
+        action=ChangeLog.DELETED, title_id=instance.title_id)
+
+
+@receiver(post_save, sender=Comment)
+def log_comment_save(sender, instance, created, **kwargs):
+    """Записывает создание или изменение комментария в журнал."""
+    previous = getattr(instance, '_previous_review_id', None)
+    if previous is not None and previous != instance.review_id_id:
+        title_id = Review.objects.filter(pk=previous).values_list(
+            'title_id', flat=True).first()
+        if title_id is not None:
+            ChangeLog.objects.create(
+                content_type=ChangeLog.COMMENT, object_id=instance.pk,
+                action=ChangeLog.DELETED, title_id=title_id,
+                review_id=previous)
+    ChangeLog.objects.create(
+        content_type=ChangeLog.COMMENT, object_id=instance.pk,
+        action=ChangeLog.CREATED if created else ChangeLog.UPDATED,
+        title_id=get_comment_title_id(instance),
+        review_id=instance.review_id_id)
+
+
+@receiver(post_delete, sender=Comment)
+def log_comment_delete(sender, instance, **kwargs):
+    """Записывает удаление комментария в журнал."""
+    title_id = get_comment_title_id(instance)
+    if title_id is None:
+        return
+    ChangeLog.objects.create(
+        content_type=ChangeLog.COMMENT, object_id=instance.pk,
+        action=ChangeLog.DELETED, title_id=title_id,
+        review_id=instance.review_id_id)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def bump_user_version(sender, instance, created=False, **kwargs):
+    """Сбрасывает версии данных, где показаны имена пользователей."""
+    if not created:
+        bump_version_on_commit(USERS_VERSION)
@@ -0,0 +1,97 @@
+import time
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from users.models import OutgoingEmail
+
+from api_yamdb.constants import (OUTBOX_BATCH_SIZE, OUTBOX_MAX_ATTEMPTS,
+                                 OUTBOX_POLL_INTERVAL, OUTBOX_RETRY_DELAY)
+
+
+class Command(BaseCommand):
+    """Скрипт для отправки писем из очереди."""
+
+    help = ('Отправляет письма из очереди пачками через одно соединение '
+            'на пачку. Неотправленные письма повторяются с растущей '
+            'задержкой. С --loop работает постоянно.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=OUTBOX_BATCH_SIZE,
+            help='Писем в одной пачке.'
+        )
+        parser.add_argument(
+            '--max-attempts', type=int, default=OUTBOX_MAX_ATTEMPTS,
+            help='Попыток отправки одного письма.'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Не завершаться, проверять очередь каждые --interval сек.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=OUTBOX_POLL_INTERVAL)
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = self.send_batch(
+                options['batch_size'], options['max_attempts'])
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Писем отправлено: {total_sent}, ошибок: {total_failed}'))
+
+    @transaction.atomic
+    def send_batch(self, batch_size, max_attempts):
+        """Отправляет пачку писем, возвращает число отправленных и ошибок."""
+        # Письма, взятые другим обработчиком, пропускаются.
+        emails = list(OutgoingEmail.objects.select_for_update(
+            skip_locked=True
+        ).filter(
+            sent_at=None, send_after__lte=timezone.now(),
+            attempts__lt=max_attempts
+        )[:batch_size])
+        if not emails:
+            return 0, 0
+        connection = get_connection()
+        try:
+            connection.open()
+            for email in emails:
+                self.send(connection, email)
+        except Exception as error:
+            # Соединение не открылось: пачка повторяется целиком.
+            for email in emails:
+                if email.sent_at is None:
+                    self.fail(email, error)
+        finally:
+            connection.close()
+        OutgoingEmail.objects.bulk_update(
+            emails, ('sent_at', 'attempts', 'send_after', 'last_error'))
+        sent = sum(email.sent_at is not None for email in emails)
+        return sent, len(emails) - sent
+
+    def send(self, connection, email):
+        try:
+            EmailMessage(
+                email.subject, email.body, email.from_email,
+                [email.recipient], connection=connection
+            ).send()
+        except Exception as error:
+            self.fail(email, error)
+            return
+        email.sent_at = timezone.now()
+
+    def fail(self, email, error):
+        email.attempts += 1
+        email.last_error = str(error)
+        email.send_after = timezone.now() + timedelta(
+            seconds=OUTBOX_RETRY_DELAY * 2 ** (email.attempts - 1))
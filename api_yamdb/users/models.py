@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 
 from api_yamdb.constants import LENG_EMAIL, ROLE_MAX_LENTH
 
@@ -12,6 +13,13 @@ ROLES = (
     (MODERATOR, 'Модератор'),
     (ADMIN, 'Администратор'),
 )
+# Уровни доступа ролей: понижение уровня отзывает выданные токены.
+ACCESS_LEVELS = {
+    USER: 1,
+    MODERATOR: 2,
+    ADMIN: 3,
+}
+ACCESS_FIELDS = {'role', 'is_staff', 'is_active'}
 
 
 class ProjectUser(AbstractUser):
@@ -22,6 +30,39 @@ class ProjectUser(AbstractUser):
                             choices=ROLES, default=USER)
     confirmation_code = models.SmallIntegerField('Код подтверждения',
                                                  blank=True, null=True)
+    token_version = models.PositiveIntegerField(
+        'Версия токенов', default=0, editable=False)
+
+    # Версия, токены которой отозваны последним сохранением.
+    revoked_token_version = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        if not ACCESS_FIELDS & user.get_deferred_fields():
+            user.loaded_access_level = user.access_level
+        return user
+
+    def save(self, *args, **kwargs):
+        loaded_access_level = getattr(self, 'loaded_access_level', None)
+        self.revoked_token_version = None
+        if (loaded_access_level is not None
+                and self.access_level < loaded_access_level):
+            self.revoked_token_version = self.token_version
+            self.token_version += 1
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {
+                    *kwargs['update_fields'], 'token_version'}
+        super().save(*args, **kwargs)
+        self.loaded_access_level = self.access_level
+
+    @property
+    def access_level(self):
+        if not self.is_active:
+            return 0
+        if self.is_admin:
+            return ACCESS_LEVELS[ADMIN]
+        return ACCESS_LEVELS.get(self.role, ACCESS_LEVELS[USER])
 
     @property
     def is_admin(self):
@@ -31,3 +72,43 @@ class ProjectUser(AbstractUser):
     @property
     def is_moderator(self):
         return self.role == MODERATOR
+
+
+class RevokedToken(models.Model):
+    """Отозванные токены: ключ и время, после которого токены истекли."""
+
+    key = models.CharField('Ключ', max_length=64, unique=True)
+    expires_at = models.DateTimeField('Действует до', db_index=True)
+
+    class Meta:
+        verbose_name = 'отозванный токен'
+        verbose_name_plural = 'Отозванные токены'
+
+    def __str__(self):
+        return self.key
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку."""
+
+    subject = models.CharField('Тема', max_length=255)
+    body = models.TextField('Текст')
+    from_email = models.CharField('Отправитель', max_length=LENG_EMAIL)
+    recipient = models.CharField('Получатель', max_length=LENG_EMAIL)
+    created_at = models.DateTimeField('Создано', auto_now_add=True)
+    send_after = models.DateTimeField('Отправить после', default=timezone.now)
+    attempts = models.PositiveSmallIntegerField('Попыток отправки', default=0)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'письмо'
+        verbose_name_plural = 'Очередь писем'
+        ordering = ('id',)
+        indexes = [
+            models.Index(
+                fields=['sent_at', 'send_after'], name='outbox_pending_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
@@ -1,6 +1,8 @@
 import os
 import sys
 
+import pytest
+from django.core.cache import cache
 from django.utils.version import get_version
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -33,3 +35,25 @@ assert get_version() < '4.0.0', 'Пожалуйста, используйте в
 pytest_plugins = [
     'tests.fixtures.fixture_user',
 ]
+
+
+@pytest.fixture(scope='session')
+def django_db_modify_db_settings(django_db_modify_db_settings_parallel_suffix):
+    # Файловая тестовая база: её видят процессы параллельной загрузки CSV.
+    from django.conf import settings
+
+    settings.DATABASES['default']['TEST']['NAME'] = os.path.join(
+        MANAGE_PATH, 'test_db.sqlite3')
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from api.authentication import local_users, verified_tokens
+    from api.throttling import get_store
+    from api.tokens import revoked_tokens
+
+    cache.clear()
+    local_users.clear()
+    verified_tokens.clear()
+    revoked_tokens.clear()
+    get_store().clear()
@@ -0,0 +1,136 @@
+from http import HTTPStatus
+
+import pytest
+
+from api.pagination import OptionalCursorPagination
+from reviews.models import Title
+from tests.utils import create_reviews, create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09CursorPagination:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    @pytest.fixture(autouse=True)
+    def small_pages(self, monkeypatch):
+        monkeypatch.setattr(OptionalCursorPagination, 'page_size', 1)
+
+    def collect_pages(self, client, url, max_pages=100):
+        results = []
+        for _ in range(max_pages):
+            if not url:
+                break
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            data = response.json()
+            assert 'count' not in data, (
+                'В режиме курсорной пагинации ответ не должен содержать '
+                'ключ `count`.'
+            )
+            results.extend(data['results'])
+            url = data['next']
+        assert not url, 'Проверьте, что ссылки `next` не зацикливаются.'
+        return results
+
+    def test_01_titles_cursor(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        data = client.get(self.TITLES_URL).json()
+        assert data['count'] == len(titles) and len(data['results']) == 1, (
+            'Без параметра `cursor` должна сохраняться постраничная '
+            'пагинация.'
+        )
+
+        results = self.collect_pages(client, f'{self.TITLES_URL}?cursor=')
+        assert [title['id'] for title in results] == sorted(
+            title['id'] for title in titles
+        ), (
+            f'Проверьте, что `{self.TITLES_URL}?cursor=` возвращает все '
+            'произведения, отсортированные по `id`.'
+        )
+
+    def test_02_reviews_cursor(self, admin_client, admin, user, user_client,
+                               moderator, moderator_client, client):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        reviews, titles = create_reviews(admin_client, author_map)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+
+        expected = []
+        for page in range(1, len(reviews) + 1):
+            data = client.get(f'{url}?page={page}').json()
+            expected.extend(review['id'] for review in data['results'])
+        results = self.collect_pages(client, f'{url}?cursor=')
+        assert [review['id'] for review in results] == expected, (
+            f'Проверьте, что `{self.REVIEWS_URL_TEMPLATE}?cursor=` '
+            'возвращает отзывы в том же порядке, что и постраничная '
+            'пагинация.'
+        )
+        assert len(results) == len(reviews)
+
+    @pytest.mark.parametrize('ordering', (
+        'rating', '-rating', 'reviews_count', 'category', '-category'))
+    def test_03_titles_cursor_with_nulls(self, admin_client, user_client,
+                                         client, ordering):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 7)
+        Title.objects.filter(id=titles[1]['id']).update(category=None)
+        expected = client.get(
+            self.TITLES_URL, {'ordering': ordering, 'page_size': 100}).json()
+        results = self.collect_pages(
+            client, f'{self.TITLES_URL}?ordering={ordering}&cursor=')
+        assert sorted(title['id'] for title in results) == sorted(
+            title['id'] for title in titles
+        ), (
+            f'Проверьте, что `{self.TITLES_URL}?ordering={ordering}&cursor=` '
+            'листается через произведения без рейтинга и категории.'
+        )
+        assert expected['count'] == len(results)
+
+    @pytest.mark.parametrize('ordering', (
+        'year', '-year', 'category', 'rating', '-rating', 'reviews_count'))
+    def test_04_many_ties(self, client, monkeypatch, ordering):
+        monkeypatch.setattr(OptionalCursorPagination, 'page_size', 100)
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {number}', year=2000)
+            for number in range(1200)
+        )
+        results = self.collect_pages(
+            client, f'{self.TITLES_URL}?ordering={ordering}&cursor=')
+        ids = [title['id'] for title in results]
+        assert len(ids) == len(set(ids)) == 1200, (
+            'Проверьте, что курсорная пагинация проходит больше 1000 '
+            'записей с одинаковым значением сортировки без повторов и '
+            'пропусков.'
+        )
+
+    def test_05_previous_pages(self, client, monkeypatch):
+        monkeypatch.setattr(OptionalCursorPagination, 'page_size', 7)
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {number}', year=2000 + number % 3)
+            for number in range(30)
+        )
+        url = f'{self.TITLES_URL}?ordering=-year&cursor='
+        forward = []
+        while True:
+            data = client.get(url).json()
+            forward.extend(title['id'] for title in data['results'])
+            if not data['next']:
+                break
+            url = data['next']
+        backward = []
+        while url:
+            data = client.get(url).json()
+            backward[:0] = [title['id'] for title in data['results']]
+            url = data['previous']
+        assert backward == forward, (
+            'Проверьте, что ссылки `previous` возвращают те же страницы в '
+            'обратном порядке.'
+        )
+        assert client.get(
+            f'{self.TITLES_URL}?cursor=abc'
+        ).status_code == HTTPStatus.NOT_FOUND
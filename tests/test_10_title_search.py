@@ -0,0 +1,77 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Title
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10TitleSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    def search(self, client, query):
+        response = client.get(self.TITLES_URL, {'search': query})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}?search=` '
+            'возвращает ответ со статусом 200.'
+        )
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_search_morphology(self, admin_client, client):
+        create_titles(admin_client)
+        admin_client.post(self.TITLES_URL, data={
+            'name': 'Побег из Шоушенка',
+            'year': 1994,
+            'genre': ['drama'],
+            'category': 'films',
+            'description': 'Банкир попадает в тюрьму.'
+        })
+        assert self.search(client, 'побега') == ['Побег из Шоушенка'], (
+            'Проверьте, что поиск учитывает формы русских слов.'
+        )
+        assert self.search(client, 'КРЕПКОГО') == ['Крепкий орешек']
+        assert self.search(client, 'ночь') == []
+
+    def test_02_search_relevance_and_sync(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        admin_client.patch(
+            self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id']),
+            data={'description': 'Орешек знаний твёрд'}
+        )
+        assert self.search(client, 'орешек') == [
+            'Крепкий орешек', 'Терминатор'
+        ], (
+            'Проверьте, что совпадения в названии ранжируются выше '
+            'совпадений в описании.'
+        )
+
+        admin_client.delete(
+            self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=titles[1]['id'])
+        )
+        assert 'Крепкий орешек' not in self.search(client, 'орешек'), (
+            'Проверьте, что удалённые произведения пропадают из поиска.'
+        )
+
+    def test_03_rebuild_search_index(self, admin_client, client):
+        create_titles(admin_client)
+        Title.objects.filter(name='Терминатор').update(name='Чужой')
+        assert self.search(client, 'чужой') == []
+        etag = client.get(self.TITLES_URL, {'search': 'чужой'})['ETag']
+
+        call_command('rebuild_search_index')
+
+        assert client.get(
+            self.TITLES_URL, {'search': 'чужой'}, HTTP_IF_NONE_MATCH=etag
+        ).status_code == HTTPStatus.OK, (
+            'Проверьте, что `rebuild_search_index` сбрасывает ETag списка '
+            'произведений.'
+        )
+
+        assert self.search(client, 'чужой') == ['Чужой'], (
+            'Проверьте, что команда `rebuild_search_index` перестраивает '
+            'поисковый индекс.'
+        )
@@ -0,0 +1,65 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11TitleFilters:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def get_names(self, client, params):
+        response = client.get(self.TITLES_URL, params)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}` с фильтрами '
+            f'{params} возвращает ответ со статусом 200.'
+        )
+        data = response.json()
+        names = sorted(title['name'] for title in data['results'])
+        assert data['count'] == len(names), (
+            'Проверьте, что фильтрация не дублирует произведения в выдаче.'
+        )
+        return names
+
+    def test_01_genre_filters(self, admin_client, client):
+        create_titles(admin_client)
+        admin_client.post(self.TITLES_URL, data={
+            'name': 'Пятый элемент',
+            'year': 1997,
+            'genre': ['horror', 'comedy', 'drama'],
+            'category': 'films',
+        })
+
+        assert self.get_names(client, {'genre': 'horror,comedy'}) == [
+            'Пятый элемент', 'Терминатор'
+        ], (
+            'Проверьте, что фильтр `genre` по нескольким слагам возвращает '
+            'произведения с любым из жанров.'
+        )
+        assert self.get_names(
+            client, {'genre': 'comedy,drama', 'genre_mode': 'all'}
+        ) == ['Пятый элемент'], (
+            'Проверьте, что при `genre_mode=all` возвращаются только '
+            'произведения со всеми указанными жанрами.'
+        )
+        assert self.get_names(client, {'genre': 'com'}) == [], (
+            'Проверьте, что фильтр `genre` сравнивает слаги точно.'
+        )
+        response = client.get(self.TITLES_URL, {'genre_mode': 'some'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_02_category_and_year_filters(self, admin_client, client):
+        create_titles(admin_client)
+
+        assert self.get_names(client, {'category': 'films,books'}) == [
+            'Крепкий орешек', 'Терминатор'
+        ]
+        assert self.get_names(client, {'category': 'book'}) == []
+        assert self.get_names(
+            client, {'year__gte': 1985, 'year__lte': 1990}
+        ) == ['Крепкий орешек'], (
+            'Проверьте, что поддерживаются фильтры `year__gte` и '
+            '`year__lte`.'
+        )
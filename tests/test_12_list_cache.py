@@ -0,0 +1,72 @@
+from http import HTTPStatus
+
+import pytest
+
+from api_yamdb.constants import LIST_CACHE_TIMEOUT, LOCAL_CACHE_TIMEOUT
+from reviews.cache import get_timeout
+from reviews.models import Category
+from tests.utils import create_categories, create_genre
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12ListCache:
+
+    CATEGORIES_URL = '/api/v1/categories/'
+    GENRES_URL = '/api/v1/genres/'
+
+    def test_01_cached_list_without_queries(self, admin_client, client,
+                                            django_assert_num_queries):
+        create_categories(admin_client)
+        expected = client.get(self.CATEGORIES_URL).json()
+
+        with django_assert_num_queries(0):
+            response = client.get(self.CATEGORIES_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == expected, (
+            'Проверьте, что закешированный ответ совпадает с исходным.'
+        )
+
+        with django_assert_num_queries(2):
+            client.get(self.CATEGORIES_URL, {'search': 'Фильм'})
+
+    def test_02_cache_invalidation(self, admin_client, client):
+        categories = create_categories(admin_client)
+        genres = create_genre(admin_client)
+        assert client.get(self.CATEGORIES_URL).json()['count'] == 2
+        assert client.get(self.GENRES_URL).json()['count'] == len(genres)
+
+        admin_client.post(
+            self.CATEGORIES_URL, data={'name': 'Музыка', 'slug': 'music'}
+        )
+        assert client.get(self.CATEGORIES_URL).json()['count'] == 3, (
+            'Проверьте, что создание категории сбрасывает кеш списка.'
+        )
+
+        admin_client.delete(f'{self.GENRES_URL}{genres[0]["slug"]}/')
+        assert client.get(self.GENRES_URL).json()['count'] == (
+            len(genres) - 1
+        ), 'Проверьте, что удаление жанра сбрасывает кеш списка.'
+
+        category = Category.objects.get(slug=categories[0]['slug'])
+        category.name = 'Кино'
+        category.save()
+        names = [
+            item['name']
+            for item in client.get(self.CATEGORIES_URL).json()['results']
+        ]
+        assert 'Кино' in names, (
+            'Проверьте, что изменение категории (например, в админке) '
+            'сбрасывает кеш списка.'
+        )
+
+    def test_03_local_cache_timeout(self, settings):
+        settings.SHARED_CACHE = False
+        assert get_timeout(None) == LOCAL_CACHE_TIMEOUT, (
+            'Проверьте, что версии в кеше процесса устаревают.'
+        )
+        assert get_timeout(LIST_CACHE_TIMEOUT) == LOCAL_CACHE_TIMEOUT, (
+            'Проверьте, что без общего кеша ответы хранятся недолго.'
+        )
+        settings.SHARED_CACHE = True
+        assert get_timeout(None) is None
+        assert get_timeout(LIST_CACHE_TIMEOUT) == LIST_CACHE_TIMEOUT
@@ -0,0 +1,101 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+
+from reviews.cache import TITLE_VERSION, VERSION_KEY
+from tests.utils import create_comments, create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13ConditionalGet:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def assert_not_modified(self, client, url, etag,
+                            django_assert_num_queries):
+        with django_assert_num_queries(0):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным '
+            '`If-None-Match` возвращает ответ со статусом 304 без '
+            'запросов к базе.'
+        )
+        assert response['ETag'] == etag
+
+    def test_01_title_detail_etag(self, admin_client, admin,
+                                  user_client, client,
+                                  django_assert_num_queries):
+        author_map = {admin: admin_client}
+        _, _, titles = create_comments(admin_client, author_map)
+        url = self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        response = client.get(url)
+        etag = response['ETag']
+        assert etag.startswith('"'), (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'сильный ETag.'
+        )
+        self.assert_not_modified(client, url, etag, django_assert_num_queries)
+
+        create_single_review(user_client, titles[0]['id'], 'Ещё отзыв', 1)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что новый отзыв меняет ETag произведения.'
+        )
+        assert response.json()['rating'] == 3
+
+        etag = response['ETag']
+        admin_client.patch('/api/v1/genres/horror/', data={'name': 'Хоррор'})
+        admin_client.patch(url, data={'genre': ['drama']})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение жанров произведения меняет ETag.'
+        )
+
+    def test_02_reviews_and_comments_etag(self, admin_client, admin,
+                                          client, django_assert_num_queries):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client}
+        )
+        reviews_url = self.REVIEWS_URL_TEMPLATE.format(
+            title_id=titles[0]['id']
+        )
+        comments_url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id']
+        )
+        for url in (reviews_url, comments_url):
+            response = client.get(url)
+            assert response.has_header('Last-Modified'), (
+                f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+                'заголовок `Last-Modified`.'
+            )
+            self.assert_not_modified(
+                client, url, response['ETag'], django_assert_num_queries
+            )
+
+        etag = client.get(comments_url)['ETag']
+        admin_client.patch(
+            f'{comments_url}{comments[0]["id"]}/', data={'text': 'Правка'}
+        )
+        response = client.get(comments_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение комментария меняет ETag списка.'
+        )
+        assert response.json()['results'][0]['text'] == 'Правка'
+
+    def test_03_expired_version_changes_etag(self, admin_client, admin,
+                                             client):
+        _, _, titles = create_comments(admin_client, {admin: admin_client})
+        url = self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        etag = client.get(url)['ETag']
+        # Версия, истёкшая в кеше процесса, начинается заново.
+        cache.delete(VERSION_KEY.format(
+            TITLE_VERSION.format(titles[0]['id'])))
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что ETag не переживает версию данных в кеше.'
+        )
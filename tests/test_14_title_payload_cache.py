@@ -0,0 +1,90 @@
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from api.payloads import build_title_payloads, get_title_payloads
+from api.serializers import TitleGetSerializer
+from reviews.models import Category, Genre, Title
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14TitlePayloadCache:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    def test_01_cached_reads(self, admin_client, client,
+                             django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        url = self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        expected = client.get(url).json()
+        with django_assert_num_queries(0):
+            assert client.get(url).json() == expected, (
+                'Проверьте, что закешированное представление произведения '
+                'совпадает с исходным.'
+            )
+
+        expected = client.get(self.TITLES_URL).json()
+        with django_assert_num_queries(2):
+            assert client.get(self.TITLES_URL).json() == expected, (
+                'Проверьте, что страница списка произведений собирается из '
+                'закешированных представлений.'
+            )
+
+    def test_02_invalidation(self, admin_client, user_client, client):
+        titles, categories, _ = create_titles(admin_client)
+        url = self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        client.get(self.TITLES_URL)
+
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 7)
+        assert client.get(url).json()['rating'] == 7, (
+            'Проверьте, что новый отзыв сбрасывает кеш произведения.'
+        )
+
+        genre = Genre.objects.get(slug=titles[0]['genre'][0])
+        genre.name = 'Триллер'
+        genre.save()
+        assert 'Триллер' in [
+            item['name'] for item in client.get(url).json()['genre']
+        ], 'Проверьте, что переименование жанра сбрасывает кеш.'
+
+        admin_client.patch(url, data={'category': categories[1]['slug']})
+        results = client.get(self.TITLES_URL).json()['results']
+        title = next(item for item in results if item['id'] == titles[0]['id'])
+        assert title['category']['slug'] == categories[1]['slug'], (
+            'Проверьте, что смена категории сбрасывает кеш произведения.'
+        )
+
+        admin_client.delete(url)
+        assert client.get(url).status_code == 404
+
+    def test_03_payload_parity(self, admin_client, user_client):
+        titles, categories, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 9)
+        title = Title.objects.create(name='Без категории', year=2000)
+        Category.objects.filter(slug=categories[1]['slug']).delete()
+        title_ids = [item['id'] for item in titles] + [title.id]
+
+        payloads = build_title_payloads(title_ids)
+        renderer = JSONRenderer()
+        for title in Title.objects.filter(id__in=title_ids).select_related(
+                'category').prefetch_related('genre'):
+            assert renderer.render(payloads[title.id]) == renderer.render(
+                TitleGetSerializer(title).data
+            ), (
+                'Проверьте, что быстрое построение представления '
+                'произведения совпадает с выводом `TitleGetSerializer`.'
+            )
+
+    def test_04_catalog_fits_cache(self, django_assert_num_queries):
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {number}', year=2000)
+            for number in range(500)
+        )
+        title_ids = list(Title.objects.values_list('id', flat=True))
+        get_title_payloads(title_ids)
+        with django_assert_num_queries(0):
+            payloads = get_title_payloads(title_ids)
+        assert len(payloads) == len(title_ids), (
+            'Проверьте, что кеш вмещает представления всего каталога.'
+        )
@@ -0,0 +1,39 @@
+import pytest
+
+from api.middleware import QueryBudgetExceeded
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15RequestMetrics:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_disabled_by_default(self, client):
+        response = client.get(self.TITLES_URL)
+        assert not response.has_header('Server-Timing'), (
+            'Замеры запросов должны включаться только настройкой '
+            '`API_INSTRUMENTATION`.'
+        )
+
+    def test_02_server_timing(self, admin_client, client, settings):
+        create_titles(admin_client)
+        settings.API_INSTRUMENTATION = True
+        response = client.get(self.TITLES_URL)
+        timing = response['Server-Timing']
+        for metric in ('db;dur=', 'queries"', 'serializer;dur=', 'view;dur='):
+            assert metric in timing, (
+                'Проверьте, что заголовок `Server-Timing` содержит время '
+                'запросов к базе, сериализации и обработки запроса.'
+            )
+
+    def test_03_query_budget(self, admin_client, client, settings):
+        create_titles(admin_client)
+        settings.API_INSTRUMENTATION = True
+        settings.API_ENFORCE_QUERY_BUDGETS = True
+        settings.API_QUERY_BUDGETS = {'title-list': 0}
+        with pytest.raises(QueryBudgetExceeded):
+            client.get(self.TITLES_URL)
+
+        settings.API_QUERY_BUDGETS = {'title-list': 4}
+        client.get(self.TITLES_URL)
@@ -0,0 +1,64 @@
+import pytest
+
+from tests.utils import create_comments, create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16NestedQueries:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def test_01_reviews_queries(self, admin_client, client, admin, moderator,
+                                user, user_client, moderator_client,
+                                django_assert_num_queries):
+        reviews, titles = create_reviews(admin_client, {
+            admin: admin_client, moderator: moderator_client,
+            user: user_client,
+        })
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        with django_assert_num_queries(3):
+            response = client.get(url)
+        assert len(response.json()['results']) == len(reviews), (
+            'Проверьте, что список отзывов получается не более чем тремя '
+            'запросами к базе независимо от числа авторов.'
+        )
+        with django_assert_num_queries(2):
+            client.get(f'{url}{reviews[0]["id"]}/')
+
+    def test_02_comments_queries(self, admin_client, client, admin,
+                                 moderator, user, user_client,
+                                 moderator_client,
+                                 django_assert_num_queries):
+        comments, reviews, titles = create_comments(admin_client, {
+            admin: admin_client, moderator: moderator_client,
+            user: user_client,
+        })
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id'])
+        with django_assert_num_queries(3):
+            response = client.get(url)
+        assert len(response.json()['results']) == len(comments), (
+            'Проверьте, что список комментариев получается не более чем '
+            'тремя запросами к базе независимо от числа авторов.'
+        )
+        with django_assert_num_queries(2):
+            client.get(f'{url}{comments[0]["id"]}/')
+
+    def test_03_missing_parent(self, admin_client, client):
+        _, titles = create_reviews(admin_client, {})
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        assert client.get(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=0)
+        ).status_code == 404, (
+            'Проверьте, что для несуществующего произведения возвращается 404.'
+        )
+        assert client.get(
+            self.COMMENTS_URL_TEMPLATE.format(
+                title_id=titles[0]['id'], review_id=0)
+        ).status_code == 404, (
+            'Проверьте, что для несуществующего отзыва возвращается 404.'
+        )
+        assert client.get(url).status_code == 200
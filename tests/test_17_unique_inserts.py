@@ -0,0 +1,77 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import IntegrityError
+
+from api.serializers import SingUpSerializer
+from reviews.models import Review
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17UniqueInserts:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    URL_SIGNUP = '/api/v1/auth/signup/'
+
+    def test_01_duplicate_review(self, admin_client, user_client, user):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 5)
+        response = user_client.post(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id']),
+            data={'text': 'Ещё отзыв', 'score': 7}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что повторный отзыв на произведение возвращает '
+            'ответ со статусом 400.'
+        )
+        assert response.json() == {'non_field_errors': [
+            'Вы не можете дважды дать отзыв на одно произведение.'
+        ]}
+        assert Review.objects.get(author=user).score == 5
+
+    def test_02_review_insert_queries(self, admin_client, user_client,
+                                      django_assert_max_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        with django_assert_max_num_queries(10) as context:
+            create_single_review(user_client, titles[0]['id'], 'Отзыв', 5)
+        assert not any(
+            'EXISTS' in query['sql'].upper() or 'LIMIT 1' in query['sql']
+            for query in context.captured_queries
+            if 'reviews_review' in query['sql']
+            and query['sql'].startswith('SELECT')
+        ), (
+            'Проверьте, что создание отзыва не проверяет дубликаты '
+            'отдельным запросом перед вставкой.'
+        )
+        assert user_client.get(url).json()['count'] == 1
+
+    def test_03_signup_conflicts(self, client, django_user_model):
+        data = {'username': 'first', 'email': 'first@yamdb.fake'}
+        assert client.post(self.URL_SIGNUP, data=data).status_code == 200
+        assert client.post(self.URL_SIGNUP, data=data).status_code == 200, (
+            'Проверьте, что повторная регистрация с теми же данными '
+            'возвращает ответ со статусом 200.'
+        )
+        response = client.post(self.URL_SIGNUP, data={
+            'username': 'first', 'email': 'second@yamdb.fake'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'username' in response.json()
+        response = client.post(self.URL_SIGNUP, data={
+            'username': 'second', 'email': 'first@yamdb.fake'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'email' in response.json()
+        assert django_user_model.objects.count() == 1
+
+    def test_04_unknown_integrity_error(self, monkeypatch):
+        def fail(*args, **kwargs):
+            raise IntegrityError('other constraint')
+
+        monkeypatch.setattr(
+            'api.serializers.User.objects.create', fail)
+        serializer = SingUpSerializer(
+            data={'username': 'third', 'email': 'third@yamdb.fake'})
+        serializer.is_valid(raise_exception=True)
+        with pytest.raises(IntegrityError):
+            serializer.save()
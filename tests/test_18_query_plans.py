@@ -0,0 +1,91 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.pagination import OptionalCursorPagination
+from tests.utils import create_comments
+
+
+def get_plans(client, url, table):
+    """Планы запросов к таблице table при GET-запросе к url."""
+    with CaptureQueriesContext(connection) as context:
+        client.get(url)
+    plans = []
+    for query in context.captured_queries:
+        if not query['sql'].startswith('SELECT') or (
+                f'FROM "{table}"' not in query['sql']):
+            continue
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {query["sql"]}')
+            plans.append([row[-1] for row in cursor.fetchall()])
+    return plans
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='Планы проверяются для SQLite.')
+@pytest.mark.django_db(transaction=True)
+class Test18QueryPlans:
+
+    def check_plans(self, plans, table, url, sort_allowed=False):
+        assert plans, f'Нет запросов к таблице `{table}` для `{url}`.'
+        for plan in plans:
+            steps = [step for step in plan if f' {table}' in step]
+            assert steps and all('USING' in step for step in steps), (
+                f'Проверьте, что запросы `{url}` к таблице `{table}` '
+                f'используют индекс, а не полный просмотр: {plan}'
+            )
+            assert sort_allowed or not any(
+                'TEMP B-TREE' in step for step in plan
+            ), (
+                f'Проверьте, что записи для `{url}` читаются из индекса '
+                f'в нужном порядке без сортировки: {plan}'
+            )
+
+    def test_01_reviews_and_comments(self, admin_client, client, admin,
+                                     user, user_client):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client})
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+        for url in (reviews_url, f'{reviews_url}?cursor='):
+            self.check_plans(
+                get_plans(client, url, 'reviews_review'),
+                'reviews_review', url)
+        for url in (comments_url, f'{comments_url}?cursor='):
+            self.check_plans(
+                get_plans(client, url, 'reviews_comment'),
+                'reviews_comment', url)
+
+    def test_02_title_filters(self, admin_client, client, admin, user,
+                              user_client):
+        _, _, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client})
+        title = titles[0]
+        for url in (
+            f'/api/v1/titles/?category={title["category"]}'
+            f'&year={title["year"]}',
+            f'/api/v1/titles/?genre={title["genre"][0]}',
+            f'/api/v1/titles/?genre={",".join(title["genre"])}'
+            '&genre_mode=all',
+        ):
+            # Страница из нескольких категорий сортируется по id.
+            self.check_plans(
+                get_plans(client, url, 'reviews_title'),
+                'reviews_title', url, sort_allowed=True)
+
+    def test_03_title_ranking(self, admin_client, client, admin, user,
+                              user_client, monkeypatch):
+        monkeypatch.setattr(OptionalCursorPagination, 'page_size', 1)
+        create_comments(
+            admin_client, {admin: admin_client, user: user_client})
+        urls = [
+            '/api/v1/titles/?ordering=-rating',
+            '/api/v1/titles/?ordering=rating',
+            '/api/v1/titles/?ordering=-reviews_count',
+            '/api/v1/titles/?ordering=-rating&cursor=',
+        ]
+        urls.append(client.get(urls[-1]).json()['next'])
+        for url in urls:
+            self.check_plans(
+                get_plans(client, url, 'reviews_title'),
+                'reviews_title', url)
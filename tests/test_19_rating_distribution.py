@@ -0,0 +1,82 @@
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Review
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19RatingDistribution:
+
+    URL_TEMPLATE = '/api/v1/titles/{title_id}/rating-distribution/'
+
+    @staticmethod
+    def get_counts(response):
+        return {
+            item['score']: item['count']
+            for item in response.json()['distribution']
+            if item['count']
+        }
+
+    def test_01_distribution(self, admin_client, user_client,
+                             moderator_client, client,
+                             django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        url = self.URL_TEMPLATE.format(title_id=titles[0]['id'])
+        response = client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что `{url}` доступен без авторизации.'
+        )
+        assert len(response.json()['distribution']) == 10, (
+            'Проверьте, что распределение содержит все оценки от 1 до 10.'
+        )
+        assert response.json()['count'] == 0
+
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 7)
+        review = create_single_review(
+            moderator_client, titles[0]['id'], 'Отзыв', 7).json()
+        create_single_review(admin_client, titles[0]['id'], 'Отзыв', 3)
+        with django_assert_num_queries(1):
+            response = client.get(url)
+        assert self.get_counts(response) == {3: 1, 7: 2}, (
+            'Проверьте, что распределение учитывает новые отзывы.'
+        )
+        assert response.json()['count'] == 3
+
+        review_url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{review["id"]}/')
+        moderator_client.patch(review_url, data={'score': 10})
+        assert self.get_counts(client.get(url)) == {3: 1, 7: 1, 10: 1}, (
+            'Проверьте, что изменение оценки переносит отзыв в другой '
+            'столбец распределения.'
+        )
+        moderator_client.delete(review_url)
+        assert self.get_counts(client.get(url)) == {3: 1, 7: 1}, (
+            'Проверьте, что удаление отзыва уменьшает распределение.'
+        )
+
+    def test_02_moved_review_and_recalculation(self, admin_client,
+                                               user_client, client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 4)
+        review = Review.objects.get()
+        review.title_id = titles[1]['id']
+        review.save()
+        assert self.get_counts(client.get(self.URL_TEMPLATE.format(
+            title_id=titles[0]['id']))) == {}
+        assert self.get_counts(client.get(self.URL_TEMPLATE.format(
+            title_id=titles[1]['id']))) == {4: 1}
+
+        Review.objects.filter(pk=review.pk).update(score=9)
+        call_command('recalculate_ratings')
+        assert self.get_counts(client.get(self.URL_TEMPLATE.format(
+            title_id=titles[1]['id']))) == {9: 1}, (
+            'Проверьте, что `recalculate_ratings` пересобирает '
+            'распределение оценок.'
+        )
+
+    def test_03_not_found(self, client):
+        assert client.get(
+            self.URL_TEMPLATE.format(title_id=0)).status_code == 404
+        assert client.get(
+            self.URL_TEMPLATE.format(title_id='abc')).status_code == 404
@@ -0,0 +1,81 @@
+import pytest
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20Leaderboards:
+
+    TITLES_URL = '/api/v1/titles/'
+    TOP_RATED_URL = '/api/v1/titles/top-rated/'
+    MOST_REVIEWED_URL = '/api/v1/titles/most-reviewed/'
+
+    @staticmethod
+    def create_reviews(admin_client, moderator_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        for client in (admin_client, moderator_client, user_client):
+            create_single_review(client, titles[0]['id'], 'Отзыв', 8)
+        create_single_review(admin_client, titles[1]['id'], 'Отзыв', 10)
+        create_single_review(moderator_client, titles[1]['id'], 'Отзыв', 9)
+        return titles
+
+    @staticmethod
+    def get_ids(response):
+        data = response.json()
+        if isinstance(data, dict):
+            data = data['results']
+        return [title['id'] for title in data]
+
+    def test_01_min_reviews(self, admin_client, moderator_client,
+                            user_client, client):
+        titles = self.create_reviews(
+            admin_client, moderator_client, user_client)
+        response = client.get(self.TOP_RATED_URL)
+        assert response.status_code == 200, (
+            f'Проверьте, что `{self.TOP_RATED_URL}` доступен без '
+            'авторизации.'
+        )
+        assert self.get_ids(response) == [titles[0]['id']], (
+            'Проверьте, что в рейтинг попадают только произведения с '
+            'достаточным числом отзывов.'
+        )
+
+    def test_02_leaderboards(self, admin_client, moderator_client,
+                             user_client, client, monkeypatch):
+        monkeypatch.setattr('api.views.LEADERBOARD_MIN_REVIEWS', 2)
+        titles = self.create_reviews(
+            admin_client, moderator_client, user_client)
+        ids = [titles[1]['id'], titles[0]['id']]
+        assert self.get_ids(client.get(self.TOP_RATED_URL)) == ids, (
+            'Проверьте, что рейтинг отсортирован по убыванию оценки.'
+        )
+        assert self.get_ids(
+            client.get(self.MOST_REVIEWED_URL)) == ids[::-1], (
+            'Проверьте, что рейтинг обсуждаемых произведений отсортирован '
+            'по убыванию числа отзывов.'
+        )
+        assert self.get_ids(client.get(
+            self.TOP_RATED_URL, {'category': titles[1]['category']}
+        )) == [titles[1]['id']], (
+            'Проверьте, что рейтинг можно получить для категории.'
+        )
+        assert self.get_ids(client.get(
+            self.TOP_RATED_URL, {'genre': titles[0]['genre'][0]}
+        )) == [titles[0]['id']], (
+            'Проверьте, что рейтинг можно получить для жанра.'
+        )
+
+    def test_03_list_ordering(self, admin_client, moderator_client,
+                              user_client, client):
+        titles = self.create_reviews(
+            admin_client, moderator_client, user_client)
+        ids = [titles[1]['id'], titles[0]['id']]
+        assert self.get_ids(client.get(
+            self.TITLES_URL, {'ordering': '-rating'})) == ids, (
+            'Проверьте, что список произведений сортируется по рейтингу.'
+        )
+        assert self.get_ids(client.get(
+            self.TITLES_URL, {'ordering': '-reviews_count'})) == ids[::-1], (
+            'Проверьте, что список произведений сортируется по числу '
+            'отзывов.'
+        )
@@ -0,0 +1,115 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Review, Title
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21ReviewBulk:
+
+    URL = '/api/v1/reviews/bulk/'
+
+    def test_01_auth(self, client):
+        response = client.post(
+            self.URL, data='[]', content_type='application/json')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            f'Проверьте, что `{self.URL}` недоступен без авторизации.'
+        )
+
+    def test_02_bulk_create(self, admin_client, user_client, client,
+                            django_assert_max_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        rating_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        assert client.get(rating_url).json()['rating'] is None
+        data = [
+            {'title': titles[0]['id'], 'text': 'Первый', 'score': 6},
+            {'title': titles[1]['id'], 'text': 'Второй', 'score': 9},
+        ]
+        with django_assert_max_num_queries(12):
+            response = user_client.post(self.URL, data=data, format='json')
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что при корректных данных пакетная загрузка '
+            'возвращает ответ со статусом 201.'
+        )
+        results = response.json()['results']
+        assert [item['status'] for item in results] == [201, 201]
+        for item, review in zip(data, results):
+            assert review['review']['title'] == item['title']
+            assert review['review']['author'] == 'TestUser'
+            assert Review.objects.filter(id=review['review']['id']).exists()
+        assert client.get(rating_url).json()['rating'] == 6, (
+            'Проверьте, что пакетная загрузка обновляет рейтинг и сбрасывает '
+            'кеш произведения.'
+        )
+        assert Title.objects.get(id=titles[1]['id']).score_count == 1
+        distribution = client.get(
+            f'{rating_url}rating-distribution/').json()['distribution']
+        assert {
+            item['score']: item['count'] for item in distribution
+        }[6] == 1
+
+    def test_03_partial_errors(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 5)
+        response = user_client.post(self.URL, data=[
+            {'title': titles[0]['id'], 'text': 'Повтор', 'score': 6},
+            {'title': titles[1]['id'], 'text': 'Оценка', 'score': 11},
+            {'title': 0, 'text': 'Нет произведения', 'score': 6},
+            {'title': titles[1]['id'], 'text': 'Новый', 'score': 8},
+            {'title': titles[1]['id'], 'text': 'Дубль', 'score': 8},
+        ], format='json')
+        assert response.status_code == HTTPStatus.MULTI_STATUS, (
+            'Проверьте, что при частично некорректных данных возвращается '
+            'ответ со статусом 207.'
+        )
+        assert [item['status'] for item in response.json()['results']] == [
+            400, 400, 404, 201, 400
+        ], 'Проверьте результаты для каждого отзыва пакета.'
+        assert response.json()['created'] == 1
+        assert Review.objects.count() == 2
+
+    def test_04_invalid_payload(self, user_client):
+        for data in ({}, []):
+            response = user_client.post(self.URL, data=data, format='json')
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                'Проверьте, что пакет без списка отзывов отклоняется.'
+            )
+
+    def test_05_all_invalid(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        response = user_client.post(self.URL, data=[
+            {'title': titles[0]['id'], 'text': 'Оценка', 'score': 11},
+            {'title': 0, 'text': 'Нет произведения', 'score': 6},
+        ], format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что пакет, в котором нет ни одного корректного '
+            'отзыва, отклоняется со статусом 400.'
+        )
+        assert [item['status'] for item in response.json()['results']] == [
+            400, 404
+        ]
+        assert response.json()['created'] == 0
+        assert not Review.objects.exists()
+
+    def test_06_scores_delta(self, admin_client, moderator_client,
+                             user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(moderator_client, title_id, 'Первый', 4)
+        response = user_client.post(self.URL, data=[
+            {'title': title_id, 'text': 'Второй', 'score': 4},
+        ], format='json')
+        assert response.status_code == HTTPStatus.CREATED
+        title = Title.objects.get(id=title_id)
+        assert (title.score_sum, title.score_count) == (8, 2), (
+            'Проверьте, что пакетная загрузка добавляет оценки к уже '
+            'сохранённым агрегатам произведения.'
+        )
+        distribution = admin_client.get(
+            f'/api/v1/titles/{title_id}/rating-distribution/'
+        ).json()['distribution']
+        assert {
+            item['score']: item['count'] for item in distribution
+        }[4] == 2
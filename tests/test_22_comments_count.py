@@ -0,0 +1,56 @@
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Review
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22CommentsCount:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    @staticmethod
+    def get_counts(client, url):
+        return {
+            review['id']: review['comments_count']
+            for review in client.get(url).json()['results']
+        }
+
+    def test_01_counter(self, admin_client, client, admin, moderator,
+                        moderator_client, user, user_client):
+        comments, reviews, titles = create_comments(admin_client, {
+            admin: admin_client, moderator: moderator_client,
+            user: user_client,
+        })
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        assert self.get_counts(client, url) == {
+            reviews[0]['id']: 3, reviews[1]['id']: 0, reviews[2]['id']: 0,
+        }, (
+            'Проверьте, что в отзывах выводится количество комментариев.'
+        )
+        assert client.get(
+            f'{url}{reviews[0]["id"]}/').json()['comments_count'] == 3
+
+        admin_client.delete(
+            f'{url}{reviews[0]["id"]}/comments/{comments[0]["id"]}/')
+        assert self.get_counts(client, url)[reviews[0]['id']] == 2, (
+            'Проверьте, что удаление комментария уменьшает счётчик и '
+            'сбрасывает кеш отзывов.'
+        )
+
+        user.delete()
+        assert self.get_counts(client, url)[reviews[0]['id']] == 1, (
+            'Проверьте, что каскадное удаление комментариев уменьшает '
+            'счётчик.'
+        )
+
+    def test_02_recalculate(self, admin_client, admin):
+        _, reviews, _ = create_comments(admin_client, {admin: admin_client})
+        Review.objects.update(comments_count=10)
+        call_command('recalculate_ratings')
+        assert Review.objects.get(
+            id=reviews[0]['id']).comments_count == 1, (
+            'Проверьте, что `recalculate_ratings` пересчитывает счётчики '
+            'комментариев.'
+        )
@@ -0,0 +1,113 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from api.views import ChangeLogView
+from reviews.models import ChangeLog
+from tests.utils import create_comments, create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23ChangesFeed:
+
+    URL = '/api/v1/changes/'
+
+    def test_01_feed(self, admin_client, client, admin, user, user_client):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client})
+        response = client.get(self.URL)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что `{self.URL}` доступен без авторизации.'
+        )
+        data = response.json()
+        assert [(item['type'], item['id'], item['action'])
+                for item in data['results']] == [
+            ('review', reviews[0]['id'], 'created'),
+            ('review', reviews[1]['id'], 'created'),
+            ('comment', comments[0]['id'], 'created'),
+            ('comment', comments[1]['id'], 'created'),
+        ], 'Проверьте, что журнал содержит созданные отзывы и комментарии.'
+        assert data['results'][0]['data']['text'] == reviews[0]['text']
+        assert data['results'][2]['review'] == reviews[0]['id']
+        since = data['next_since']
+
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        user_client.patch(
+            f'{reviews_url}{reviews[1]["id"]}/', data={'text': 'Новый'})
+        user_client.patch(
+            f'{reviews_url}{reviews[1]["id"]}/', data={'text': 'Новее'})
+        admin_client.delete(
+            f'{reviews_url}{reviews[0]["id"]}/comments/{comments[0]["id"]}/')
+        data = client.get(self.URL, {'since': since}).json()
+        assert [(item['type'], item['id'], item['action'])
+                for item in data['results']] == [
+            ('review', reviews[1]['id'], 'updated'),
+            ('comment', comments[0]['id'], 'deleted'),
+        ], (
+            'Проверьте, что после `since` возвращаются только новые '
+            'изменения, по одному на объект.'
+        )
+        assert data['results'][0]['data']['text'] == 'Новее'
+        assert data['results'][1]['data'] is None, (
+            'Проверьте, что для удалённых объектов данные не возвращаются.'
+        )
+        assert client.get(
+            self.URL, {'since': data['next_since']}).json()['results'] == []
+
+    def test_02_limit_and_title(self, admin_client, client, admin, user,
+                                user_client):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client})
+        create_single_review(user_client, titles[1]['id'], 'Отзыв', 5)
+        data = client.get(self.URL, {'limit': 3}).json()
+        assert len(data['results']) == 3 and data['has_more'], (
+            'Проверьте, что параметр `limit` ограничивает выборку.'
+        )
+        data = client.get(
+            self.URL, {'since': data['next_since'], 'limit': 3}).json()
+        assert len(data['results']) == 2 and not data['has_more']
+
+        data = client.get(self.URL, {'title': titles[1]['id']}).json()
+        assert [item['title'] for item in data['results']] == [
+            titles[1]['id']
+        ], 'Проверьте фильтрацию журнала по произведению.'
+        assert client.get(
+            self.URL, {'since': 'abc'}).status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_safety_window(self, admin_client, client, admin, user,
+                              user_client, monkeypatch):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client})
+        ChangeLog.objects.filter(id__lte=ChangeLog.objects.filter(
+            object_id=reviews[1]['id'], content_type=ChangeLog.REVIEW
+        ).get().id).update(created_at=timezone.now() - timedelta(minutes=1))
+        monkeypatch.setattr(
+            ChangeLogView, 'get_safety_window', staticmethod(lambda: 5))
+        data = client.get(self.URL).json()
+        assert [item['id'] for item in data['results']] == [
+            reviews[0]['id'], reviews[1]['id']
+        ], (
+            'Проверьте, что вне SQLite журнал не отдаёт записи моложе '
+            'окна безопасности.'
+        )
+        assert client.get(
+            self.URL, {'since': data['next_since']}).json()['results'] == []
+
+    def test_04_prune(self, admin_client, client, admin, user,
+                      user_client):
+        create_comments(
+            admin_client, {admin: admin_client, user: user_client})
+        old_ids = list(ChangeLog.objects.values_list('id', flat=True)[:2])
+        ChangeLog.objects.filter(id__in=old_ids).update(
+            created_at=timezone.now() - timedelta(days=31))
+        call_command('prune_changelog')
+        assert ChangeLog.objects.count() == 2, (
+            'Проверьте, что prune_changelog удаляет записи старше срока '
+            'хранения.'
+        )
+        assert not ChangeLog.objects.filter(id__in=old_ids).exists()
+        call_command('prune_changelog', days=0)
+        assert not ChangeLog.objects.exists()
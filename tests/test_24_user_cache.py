@@ -0,0 +1,65 @@
+from http import HTTPStatus
+
+import pytest
+from django.conf import settings
+from django.db.models import F
+
+from users.models import ProjectUser
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24UserCache:
+
+    ME_URL = '/api/v1/users/me/'
+    USERS_URL = '/api/v1/users/'
+
+    def test_01_cached_auth(self, user_client, django_assert_num_queries):
+        user_client.get(self.ME_URL)
+        with django_assert_num_queries(0):
+            response = user_client.get(self.ME_URL)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что повторный запрос авторизованного пользователя '
+            'не обращается к базе для аутентификации.'
+        )
+
+    def test_02_invalidation(self, admin_client, user_client, user):
+        assert user_client.get(
+            self.USERS_URL).status_code == HTTPStatus.FORBIDDEN
+        admin_client.patch(
+            f'{self.USERS_URL}{user.username}/', data={'role': 'admin'})
+        assert user_client.get(self.USERS_URL).status_code == HTTPStatus.OK, (
+            'Проверьте, что смена роли сбрасывает кеш пользователя.'
+        )
+
+        user_client.patch(self.ME_URL, data={'bio': 'Новая биография'})
+        assert user_client.get(
+            self.ME_URL).json()['bio'] == 'Новая биография', (
+            'Проверьте, что изменение профиля сбрасывает кеш пользователя.'
+        )
+
+        admin_client.delete(f'{self.USERS_URL}{user.username}/')
+        assert user_client.get(
+            self.ME_URL).status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что удалённый пользователь не проходит '
+            'аутентификацию.'
+        )
+
+    def test_03_me_updates_fresh_user(self, user_client, user):
+        user_client.get(self.ME_URL)
+        # Изменение другим процессом: кеш этого процесса не сбрасывается.
+        ProjectUser.objects.filter(pk=user.pk).update(
+            role='moderator', token_version=F('token_version') + 1)
+        response = user_client.patch(self.ME_URL, data={'bio': 'Биография'})
+        assert response.status_code == HTTPStatus.OK
+        user.refresh_from_db()
+        assert user.bio == 'Биография'
+        assert (user.role, user.token_version) == ('moderator', 1), (
+            'Проверьте, что изменение профиля через `/users/me/` не '
+            'возвращает роль и версию токенов из кеша аутентификации.'
+        )
+
+    def test_04_shared_tier(self):
+        assert settings.AUTH_USER_CACHE is None or settings.SHARED_CACHE, (
+            'Проверьте, что второй уровень кеша пользователей включается '
+            'только с общим для процессов кешем.'
+        )
@@ -0,0 +1,96 @@
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.core.management import call_command
+from django.utils import timezone
+
+from reviews.models import User
+from users.models import OutgoingEmail
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25EmailOutbox:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+
+    def signup(self, client, number):
+        response = client.post(self.URL_SIGNUP, data={
+            'username': f'user_{number}',
+            'email': f'user_{number}@yamdb.fake',
+        })
+        assert response.status_code == 200
+
+    def test_01_enqueue_and_send(self, client, monkeypatch):
+        for number in range(3):
+            self.signup(client, number)
+        assert len(mail.outbox) == 0, (
+            'Проверьте, что регистрация только ставит письмо в очередь.'
+        )
+        assert OutgoingEmail.objects.count() == 3
+
+        connections = []
+        get_connection = mail.get_connection
+
+        def counting_connection(*args, **kwargs):
+            connections.append(1)
+            return get_connection(*args, **kwargs)
+
+        monkeypatch.setattr(
+            'users.management.commands.send_outbox_emails.get_connection',
+            counting_connection)
+        call_command('send_outbox_emails', batch_size=2, stdout=StringIO())
+        assert len(mail.outbox) == 3, (
+            'Проверьте, что команда `send_outbox_emails` отправляет письма '
+            'из очереди.'
+        )
+        assert len(connections) == 2, (
+            'Проверьте, что на пачку писем открывается одно соединение.'
+        )
+        assert not OutgoingEmail.objects.filter(sent_at=None).exists()
+        call_command('send_outbox_emails', stdout=StringIO())
+        assert len(mail.outbox) == 3, 'Письма не должны отправляться дважды.'
+
+    def test_02_retry(self, client, monkeypatch):
+        self.signup(client, 0)
+
+        def fail(self, *args, **kwargs):
+            raise OSError('Сервер недоступен')
+
+        monkeypatch.setattr(EmailMessage, 'send', fail)
+        call_command('send_outbox_emails', stdout=StringIO())
+        email = OutgoingEmail.objects.get()
+        assert email.sent_at is None and email.attempts == 1, (
+            'Проверьте, что неотправленное письмо остаётся в очереди.'
+        )
+        assert email.send_after > timezone.now(), (
+            'Проверьте, что повторная отправка откладывается.'
+        )
+        assert 'Сервер недоступен' in email.last_error
+
+        monkeypatch.undo()
+        OutgoingEmail.objects.update(send_after=timezone.now())
+        call_command('send_outbox_emails', stdout=StringIO())
+        assert len(mail.outbox) == 1
+        assert OutgoingEmail.objects.get().sent_at is not None
+
+    def test_03_max_attempts(self, client):
+        self.signup(client, 0)
+        OutgoingEmail.objects.update(attempts=5)
+        call_command('send_outbox_emails', max_attempts=5, stdout=StringIO())
+        assert len(mail.outbox) == 0, (
+            'Проверьте, что после исчерпания попыток письмо не отправляется.'
+        )
+
+    def test_04_atomic_signup(self, client, monkeypatch):
+        def fail(**kwargs):
+            raise RuntimeError('Очередь недоступна')
+
+        monkeypatch.setattr(OutgoingEmail.objects, 'create', fail)
+        with pytest.raises(RuntimeError):
+            self.signup(client, 0)
+        assert not User.objects.filter(username='user_0').exists(), (
+            'Проверьте, что пользователь и письмо с кодом сохраняются в '
+            'одной транзакции.'
+        )
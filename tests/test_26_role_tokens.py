@@ -0,0 +1,92 @@
+from http import HTTPStatus
+
+import pytest
+from rest_framework.test import APIClient
+
+from api.tokens import (BloomFilter, RoleAccessToken, get_token_key,
+                        revoked_tokens)
+from users.models import RevokedToken
+
+
+def get_client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {RoleAccessToken.for_user(user)}')
+    return client
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26RoleTokens:
+
+    USERS_URL = '/api/v1/users/'
+
+    def test_01_role_claims(self, admin, django_user_model):
+        token = RoleAccessToken.for_user(admin)
+        assert token['role'] == 'admin' and token['ver'] == 0, (
+            'Проверьте, что токен содержит роль и версию токенов.'
+        )
+        client = get_client(admin)
+        # Роль в базе меняется в обход save: права берутся из токена.
+        django_user_model.objects.filter(pk=admin.pk).update(role='user')
+        assert client.get(self.USERS_URL).status_code == HTTPStatus.OK, (
+            'Проверьте, что права проверяются по роли из токена.'
+        )
+
+    def test_02_downgrade_revokes(self, admin_client, moderator,
+                                  django_user_model):
+        moderator_client = get_client(moderator)
+        assert moderator_client.get(
+            '/api/v1/users/me/').status_code == HTTPStatus.OK
+        admin_client.patch(
+            f'{self.USERS_URL}{moderator.username}/', data={'role': 'user'})
+        assert moderator_client.get(
+            '/api/v1/users/me/').status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что понижение роли отзывает выданные токены.'
+        )
+        moderator = django_user_model.objects.get(pk=moderator.pk)
+        assert moderator.token_version == 1
+        assert get_client(moderator).get(
+            '/api/v1/users/me/').status_code == HTTPStatus.OK, (
+            'Проверьте, что новый токен после понижения роли действует.'
+        )
+
+    def test_03_upgrade_keeps_tokens(self, admin_client, user):
+        user_client = get_client(user)
+        admin_client.patch(
+            f'{self.USERS_URL}{user.username}/', data={'role': 'moderator'})
+        assert user_client.get(
+            '/api/v1/users/me/').status_code == HTTPStatus.OK, (
+            'Проверьте, что повышение роли не отзывает токены.'
+        )
+
+    def test_04_delete_revokes(self, admin_client, user):
+        token = RoleAccessToken.for_user(user)
+        admin_client.delete(f'{self.USERS_URL}{user.username}/')
+        assert RevokedToken.objects.filter(
+            key=get_token_key(user.pk, 0)).exists()
+        assert revoked_tokens.is_revoked(token), (
+            'Проверьте, что удаление пользователя отзывает его токены.'
+        )
+
+    def test_05_refresh(self, user):
+        token = RoleAccessToken.for_user(user)
+        RevokedToken.objects.create(
+            key=get_token_key(user.pk, 0), expires_at=token.current_time
+            + token.lifetime)
+        assert not revoked_tokens.is_revoked(token)
+        revoked_tokens.refresh()
+        assert revoked_tokens.is_revoked(token), (
+            'Проверьте, что фильтр перечитывает отзывы других процессов.'
+        )
+
+
+def test_26_bloom_filter():
+    bloom = BloomFilter(1000, 0.01)
+    for number in range(1000):
+        bloom.add(f'user:{number}:0')
+    assert all(f'user:{number}:0' in bloom for number in range(1000))
+    false_positives = sum(
+        f'user:{number}:1' in bloom for number in range(10000))
+    assert false_positives < 300, (
+        'Проверьте долю ложных срабатываний фильтра Блума.'
+    )
@@ -0,0 +1,80 @@
+import time
+from datetime import timedelta
+from http import HTTPStatus
+from unittest import mock
+
+import pytest
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.backends import TokenBackend
+
+from api.authentication import verified_tokens
+from api.tokens import RoleAccessToken
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27TokenCache:
+
+    ME_URL = '/api/v1/users/me/'
+    STATS_URL = '/api/v1/auth/cache-stats/'
+
+    def test_01_cached_verification(self, user_client):
+        decode = TokenBackend.decode
+        calls = []
+
+        def counting_decode(self, *args, **kwargs):
+            calls.append(1)
+            return decode(self, *args, **kwargs)
+
+        with mock.patch.object(TokenBackend, 'decode', counting_decode):
+            for _ in range(3):
+                response = user_client.get(self.ME_URL)
+                assert response.status_code == HTTPStatus.OK
+        assert len(calls) == 1, (
+            'Проверьте, что подпись повторно присланного токена не '
+            'проверяется заново.'
+        )
+        assert verified_tokens.hits == 2 and verified_tokens.misses == 1
+
+    def test_02_invalid_token_not_cached(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION='Bearer invalid')
+        for _ in range(2):
+            assert client.get(
+                self.ME_URL).status_code == HTTPStatus.UNAUTHORIZED
+        assert verified_tokens.stats()['size'] == 0, (
+            'Проверьте, что кешируются только прошедшие проверку токены.'
+        )
+
+    def test_03_expired_token(self, user):
+        token = RoleAccessToken.for_user(user)
+        token.set_exp(lifetime=timedelta(seconds=2))
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        assert client.get(self.ME_URL).status_code == HTTPStatus.OK
+        time.sleep(2.1)
+        assert client.get(
+            self.ME_URL).status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что токен кешируется не дольше срока действия.'
+        )
+
+    def test_04_revoked_cached_token(self, admin_client, moderator):
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {RoleAccessToken.for_user(moderator)}')
+        assert client.get(self.ME_URL).status_code == HTTPStatus.OK
+        admin_client.delete(f'/api/v1/users/{moderator.username}/')
+        assert client.get(
+            self.ME_URL).status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что закешированный токен проверяется на отзыв.'
+        )
+
+    def test_05_stats(self, admin_client, user_client):
+        assert user_client.get(
+            self.STATS_URL).status_code == HTTPStatus.FORBIDDEN
+        response = admin_client.get(self.STATS_URL)
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert set(data) == {'tokens', 'users'}
+        assert set(data['tokens']) == {'hits', 'misses', 'size', 'maxsize'}, (
+            f'Проверьте, что `{self.STATS_URL}` отдаёт счётчики кеша.'
+        )
@@ -0,0 +1,110 @@
+import time
+from http import HTTPStatus
+
+import pytest
+
+from api.throttling import LocalMemoryStore, RedisStore
+from reviews.models import Title
+
+RATES = {'signup': '2/min', 'token': '2/min', 'write': '2/min'}
+
+
+@pytest.fixture
+def low_rates(settings):
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': RATES}
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28Throttling:
+
+    @pytest.mark.parametrize('url', (
+        '/api/v1/auth/signup/', '/api/v1/auth/token/'))
+    def test_01_auth_throttled(self, client, low_rates, url):
+        for _ in range(2):
+            assert client.post(
+                url, data={}).status_code == HTTPStatus.BAD_REQUEST
+        response = client.post(url, data={})
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            f'Проверьте, что частота запросов к `{url}` ограничена.'
+        )
+        assert int(response['Retry-After']) > 0
+
+    def test_02_writes_throttled(self, low_rates, user_client,
+                                 moderator_client, admin):
+        url = f'/api/v1/titles/{Title.objects.create(name="a", year=1).id}/'
+        for _ in range(2):
+            user_client.post(f'{url}reviews/', data={})
+        for _ in range(3):
+            assert user_client.get(
+                f'{url}reviews/').status_code == HTTPStatus.OK, (
+                'Проверьте, что чтение отзывов не ограничивается.'
+            )
+        assert user_client.post(
+            f'{url}reviews/', data={}
+        ).status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что частота добавления отзывов ограничена.'
+        )
+        assert moderator_client.post(
+            f'{url}reviews/', data={}
+        ).status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что ограничение считается для каждого пользователя.'
+        )
+
+    def test_03_forwarded_for_ignored(self, client, low_rates):
+        url = '/api/v1/auth/signup/'
+        statuses = [
+            client.post(
+                url, data={}, HTTP_X_FORWARDED_FOR=f'10.0.0.{number}'
+            ).status_code
+            for number in range(3)
+        ]
+        assert statuses[-1] == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что смена заголовка X-Forwarded-For не обходит '
+            'ограничение частоты запросов.'
+        )
+
+
+@pytest.fixture(params=('local', 'redis'))
+def store(request, monkeypatch):
+    if request.param == 'local':
+        return LocalMemoryStore()
+    fakeredis = pytest.importorskip('fakeredis')
+    pytest.importorskip('lupa')
+    monkeypatch.setattr(
+        'redis.Redis.from_url', fakeredis.FakeRedis.from_url)
+    redis_store = RedisStore(url='redis://test', prefix='test:')
+    # Данные fakeredis общие для клиентов с одним адресом.
+    redis_store.clear()
+    return redis_store
+
+
+def test_28_store_contract(store):
+    assert store.consume('a', 2, 100) == 0
+    assert store.consume('a', 2, 100) == 0
+    assert store.consume('a', 2, 100) == pytest.approx(0.01, abs=0.005), (
+        'Проверьте, что пустая корзина не пропускает запрос и возвращает '
+        'время до следующего токена.'
+    )
+    assert store.consume('b', 2, 100) == 0, (
+        'Проверьте, что корзины разных ключей независимы.'
+    )
+    time.sleep(0.02)
+    assert store.consume('a', 2, 100) == 0, (
+        'Проверьте, что корзина пополняется со временем.'
+    )
+    store.consume('c', 1, 1)
+    store.clear()
+    assert store.consume('c', 1, 1) == 0, (
+        'Проверьте, что clear() очищает корзины.'
+    )
+
+
+def test_28_local_store_size():
+    store = LocalMemoryStore(maxsize=2)
+    store.consume('a', 1, 1)
+    store.consume('b', 1, 1)
+    store.consume('c', 1, 1)
+    assert list(store.buckets) == ['b', 'c'], (
+        'Проверьте, что число корзин в памяти ограничено.'
+    )
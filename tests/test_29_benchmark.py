@@ -0,0 +1,69 @@
+import json
+
+import pytest
+from django.core.management import call_command
+from django.urls import get_resolver, resolve
+from django.urls.resolvers import URLResolver
+
+from reviews.models import ChangeLog, Comment, Review, Title
+from users.models import ProjectUser
+
+
+def get_api_routes(patterns=None, prefix=''):
+    """Шаблоны URL API и их методы, без вариантов с суффиксом формата."""
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+    for pattern in patterns:
+        route = prefix + str(pattern.pattern).lstrip('^')
+        if isinstance(pattern, URLResolver):
+            yield from get_api_routes(pattern.url_patterns, route)
+            continue
+        if not route.startswith('api/') or '(?P<format>' in route:
+            continue
+        view = pattern.callback.cls
+        methods = getattr(pattern.callback, 'actions', None) or [
+            method for method in view.http_method_names
+            if hasattr(view, method)
+        ]
+        for method in methods:
+            if method in view.http_method_names and method not in (
+                    'head', 'options'):
+                yield route, method.upper()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_29_benchmark(tmp_path, settings):
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {
+            'signup': '1/min', 'token': '1/min', 'write': '1/min'},
+    }
+    call_command(
+        'seed_benchmark_data', users=5, titles=60, reviews=40, comments=40,
+        stdout=open(tmp_path / 'seed.log', 'w'))
+    models = (ProjectUser, Title, Review, Comment, ChangeLog)
+    before = {model: model.objects.count() for model in models}
+    output = tmp_path / 'result.json'
+    call_command(
+        'benchmark_api', requests=2, warmup=1, output=str(output),
+        stdout=open(tmp_path / 'benchmark.log', 'w'))
+    results = json.loads(output.read_text())['results']
+    measured = {
+        (resolve(result['url'].split('?')[0]).route.lstrip('^'),
+         result['method'])
+        for result in results.values()
+    }
+    missing = set(get_api_routes()) - measured
+    assert not missing, (
+        f'Проверьте, что benchmark_api замеряет все эндпоинты: {missing}.'
+    )
+    for name, result in results.items():
+        assert all(status < 300 for status in result['statuses']), (
+            f'Проверьте, что запросы {name} в замерах выполняются успешно '
+            f'и не ограничиваются по частоте: {result["statuses"]}.'
+        )
+    assert before == {model: model.objects.count() for model in models}, (
+        'Проверьте, что benchmark_api не изменяет данные в базе.'
+    )
+    assert not ProjectUser.objects.exclude(
+        confirmation_code=None).filter(confirmation_code=1234).exists()
@@ -0,0 +1,87 @@
+import csv
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+
+from reviews.management.csv_import import init_worker, worker_known_ids
+from reviews.models import Comment, Genre, GenreTitle, Review, Title
+
+DATA_DIR = Path(__file__).resolve().parent.parent / 'api_yamdb/static/data'
+
+
+def count_csv_rows(file_name):
+    with open(DATA_DIR / file_name, encoding='utf-8') as file:
+        return sum(1 for _ in csv.DictReader(file))
+
+
+def get_worker_state():
+    from django.apps import apps
+
+    return apps.ready, worker_known_ids
+
+
+def load(**options):
+    stdout = StringIO()
+    call_command('load_data_csv', str(DATA_DIR), stdout=stdout, **options)
+    return stdout.getvalue()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test30LoadDataCsv:
+
+    MODELS = {
+        'genre.csv': Genre,
+        'titles.csv': Title,
+        'genre_title.csv': GenreTitle,
+        'review.csv': Review,
+        'comments.csv': Comment,
+    }
+
+    def assert_loaded(self):
+        for file_name, model in self.MODELS.items():
+            assert model.objects.count() == count_csv_rows(file_name), (
+                f'Проверьте, что команда load_data_csv загружает все строки '
+                f'файла {file_name}.'
+            )
+
+    def test_01_batched_import(self):
+        output = load(batch_size=7)
+        self.assert_loaded()
+        assert f'добавлено {count_csv_rows("review.csv")} строк' in output
+        assert Title.objects.exclude(score_count=0).exists(), (
+            'Проверьте, что после загрузки пересчитываются рейтинги.'
+        )
+
+    def test_02_idempotent_rerun(self):
+        load()
+        output = load(batch_size=7)
+        self.assert_loaded()
+        assert 'добавлено строк: 0' in output, (
+            'Проверьте, что повторная загрузка сообщает о нуле добавленных '
+            'строк.'
+        )
+
+    def test_03_parallel_import(self):
+        output = load(workers=2, chunk_size=10, batch_size=7)
+        self.assert_loaded()
+        assert 'добавлено строк: 0' not in output
+        load(workers=2, chunk_size=10)
+        self.assert_loaded()
+
+
+def test_30_spawn_worker():
+    # Процесс, запущенный spawn, импортирует модуль обработчика до
+    # настройки Django.
+    with ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context('spawn'),
+            initializer=init_worker,
+            initargs=({'reviews.Title': {1}},)) as executor:
+        ready, known_ids = executor.submit(get_worker_state).result()
+    assert ready and known_ids == {'reviews.Title': {1}}, (
+        'Проверьте, что процесс-обработчик загрузки CSV запускается '
+        'методом spawn.'
+    )